@@ -0,0 +1,72 @@
+# 콜드 스타트 벤치마크: 단일 파일 app.py(패키지로 나누기 전) vs 지금의 app.py + bookclimbing 패키지
+#
+#   python bench/cold_start.py [--before REV] [--repeat N]
+#
+# 변형마다 새 프로세스를 N번 띄워 AppTest로 재고 중앙값을 냄 (streamlit 자체 임포트는 서버가 먼저 하므로 빼고 잼)
+#   first_run  : 새 프로세스의 첫 실행 = 앱 코드 임포트 + 첫 화면(책 검색) 그리기
+#   rerun      : 같은 세션 다시 실행 (위젯을 누를 때마다 드는 시간)
+#   dashboard  : 그다음 처음 여는 포트폴리오/대시보드 화면 (pandas를 여기서 처음 임포트)
+#   heavy      : 첫 화면 뒤에 이미 올라와 있는 무거운 모듈
+# 둘 다 같은 임시 작업 폴더(classdb.db 미리 생성, data/ 없음)에서 돌려 DB 준비·JSONL 가져오기 시간은 같게 맞춤
+
+import argparse, json, os, statistics, subprocess, sys, tempfile, time
+
+ROOT  = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("openai", "pandas", "bs4")
+SECRETS = {"OPENAI_API_KEY": "x", "NAVER_CLIENT_ID": "x", "NAVER_CLIENT_SECRET": "x"}
+
+def child(app:str):
+    from streamlit.testing.v1 import AppTest
+    def run(page=None, at=None):
+        at = at or AppTest.from_file(app, default_timeout=120)
+        for k, v in SECRETS.items(): at.secrets[k] = v
+        if page: at.session_state["current_page"] = page
+        t0 = time.perf_counter(); at.run(); ms = (time.perf_counter()-t0)*1000
+        if at.exception: raise SystemExit(f"{app}: {at.exception[0].value}")
+        return at, ms
+    at, first = run("책 검색")
+    heavy = [m for m in HEAVY if m in sys.modules]
+    _, rerun = run(at=at)
+    _, dash = run("포트폴리오/대시보드", at)
+    print(json.dumps({"first_run": first, "rerun": rerun, "dashboard": dash, "heavy": heavy}))
+
+def sample(app:str, cwd:str)->dict:
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", app], cwd=cwd,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def before_rev()->str:
+    # 패키지를 처음 들여온 커밋의 부모 = 마지막 단일 파일 app.py
+    added = subprocess.run(["git", "log", "--format=%h", "--diff-filter=A", "--", "bookclimbing/__init__.py"],
+                           cwd=ROOT, capture_output=True, text=True).stdout.split()
+    return f"{added[-1]}^" if added else "HEAD"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--before", help="비교할 단일 파일 app.py의 git 리비전 (기본: 패키지 분리 직전)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--child")
+    args = ap.parse_args()
+    if args.child: return child(args.child)
+
+    rev = args.before or before_rev()
+    with tempfile.TemporaryDirectory() as tmp:
+        old = os.path.join(tmp, "before", "app.py"); os.makedirs(os.path.dirname(old))
+        with open(old, "wb") as f:
+            f.write(subprocess.run(["git", "show", f"{rev}:app.py"], cwd=ROOT, capture_output=True, check=True).stdout)
+        variants = {f"before ({rev})": old, "after": os.path.join(ROOT, "app.py")}
+        results = {}
+        for name, app in variants.items():
+            cwd = os.path.join(tmp, "cwd-" + name.split()[0]); os.makedirs(cwd)
+            sample(app, cwd)   # DB 생성·마이그레이션은 여기서 한 번
+            runs = [sample(app, cwd) for _ in range(args.repeat)]
+            results[name] = {k: statistics.median(r[k] for r in runs) for k in ("first_run", "rerun", "dashboard")}
+            results[name]["heavy"] = ",".join(runs[0]["heavy"]) or "-"
+
+    print(f"중앙값(ms), 새 프로세스 {args.repeat}회\n")
+    print("| | first_run | rerun | dashboard | heavy (첫 화면 뒤) |\n|---|---:|---:|---:|---|")
+    for name, r in results.items():
+        print(f"| {name} | {r['first_run']:.0f} | {r['rerun']:.0f} | {r['dashboard']:.0f} | {r['heavy']} |")
+
+if __name__ == "__main__":
+    main()
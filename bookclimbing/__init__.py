@@ -0,0 +1,2 @@
+# 북클라이밍: 자기주도적 독서 습관 기르기
+# 화면은 main.main(), 관리 명령은 python -m bookclimbing. 무거운 의존성(openai·pandas·bs4)은 쓰는 곳에서 처음 쓸 때 임포트
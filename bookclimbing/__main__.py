@@ -0,0 +1,31 @@
+# 북클라이밍 · 관리 명령: python -m bookclimbing <명령> (python app.py <명령> 도 같음)
+
+import sys
+
+def cli(argv:list)->bool:
+    """알려진 명령이면 실행하고 True, 아니면 False"""
+    if argv[:1]==["rebuild-rollups"]:
+        from .storage import rebuild_rollups
+        rebuild_rollups(); print("rollups rebuilt")
+    elif argv[:1]==["precompute"]:
+        from .util import clean_html, llm_priority_as, PRIO_BATCH
+        from .books import fetch_grade_recs, precompute_book
+        for g in map(int, argv[1:] or [3,4,5,6]):
+            for b in fetch_grade_recs(g):
+                with llm_priority_as(PRIO_BATCH): precompute_book(b)
+                print("precomputed", g, clean_html(b.get("title","")))
+    elif argv[:1]==["import-jsonl"]:
+        # python -m bookclimbing import-jsonl [students.jsonl events.jsonl]
+        from .storage import import_all_jsonl
+        for path, s in import_all_jsonl(*argv[1:3]).items(): print("imported", path, dict(s))
+    elif argv[:1]==["export-jsonl"]:
+        # python -m bookclimbing export-jsonl [students.jsonl events.jsonl]
+        from .storage import export_all_jsonl
+        for path, n in export_all_jsonl(*argv[1:3]).items(): print("exported", path, n)
+    else: return False
+    return True
+
+if __name__=="__main__":
+    if not cli(sys.argv[1:]):
+        print("usage: python -m bookclimbing {rebuild-rollups | precompute [학년…] | import-jsonl [students events] | export-jsonl [students events]}")
+        sys.exit(2)
@@ -0,0 +1,218 @@
+# 북클라이밍 · 책 내용 생성 (줄거리·퀴즈·토론 주제·낱말) & 추천·사전 생성
+
+import streamlit as st, re, json, datetime, random, threading, collections, functools
+from .util import book_key, clean_html, llm_priority_as, PRIO_BATCH, run_parallel, strip_fence, _isbn, _json_ok
+from .storage import _db
+from .clients.llm import gpt, gpt_stream
+from .clients.naver import crawl_syn, nv_search
+
+#  줄거리
+def synopsis(title,b):
+    d=clean_html(b.get("description","")); c=crawl_syn(title,_isbn(b)); return (d+"\n\n"+c).strip() if (d or c) else ""
+def elem_syn(title,s,level,stream=False):
+    detail={"쉬움":"초등 저학년, 12~16문장","기본":"초등 중학년, 16~20문장","심화":"초등 고학년, 18~22문장(배경·인물 감정·주제 의식 포함)"}[level]
+    return (gpt_stream if stream else gpt)([{"role":"user","content":f"아래 원문만 근거로 책 '{title}'의 줄거리를 {detail}로 자세히 써줘. (배경/인물/갈등/결말·주제 포함)\n\n원문:\n{s}"}],0.32,3200,kind="elem_syn")
+
+#  퀴즈 생성 보조 
+QUIZ_ITEMS = 5
+QUIZ_MAX_ROUNDS = 3
+# 구조화 출력(JSON schema): 모델이 형식 밖의 글을 섞지 못하게 함. 개수·내용 검증은 _quiz_item이 문항별로
+QUIZ_SCHEMA = {"type":"json_schema", "json_schema":{"name":"quiz", "strict":True, "schema":{
+    "type":"object", "additionalProperties":False, "required":["items"],
+    "properties":{"items":{"type":"array", "items":{
+        "type":"object", "additionalProperties":False, "required":["question","options","correct_answer"],
+        "properties":{"question":{"type":"string"}, "options":{"type":"array", "items":{"type":"string"}},
+                      "correct_answer":{"type":"integer"}}}}}}}}
+
+def _quiz_item(it):
+    # 문항 하나를 검증·정규화(보기 섞기). 쓸 수 없으면 None
+    if isinstance(it,str):
+        try: it=json.loads(it)
+        except: return None
+    if not isinstance(it,dict): return None
+    if "answer" in it and "correct_answer" not in it: it["correct_answer"]=it.pop("answer")
+    if not {"question","options","correct_answer"}.issubset(it.keys()): return None
+    if not isinstance(it["options"],list): return None
+    opts=[str(o).strip() for o in it["options"]]
+    if len(opts)!=4 or len(set(opts))!=4 or not str(it["question"]).strip(): return None
+    ca=it["correct_answer"]
+    if isinstance(ca,str) and ca.strip().isdigit(): ca=int(ca)
+    if isinstance(ca,int):
+        if not 1<=ca<=4: return None
+        correct_txt=opts[ca-1]
+    else: correct_txt=str(ca).strip()
+    random.shuffle(opts)
+    if correct_txt not in opts: opts[0]=correct_txt
+    return {"question":str(it["question"]).strip(),"options":opts,"correct_answer":opts.index(correct_txt)+1}
+
+def parse_quiz_items(raw:str):
+    """{"items":[...]} 또는 맨 배열 모두 허용. JSON 자체가 깨졌으면 None, 아니면 유효 문항 목록."""
+    txt=strip_fence(raw or "")
+    try: data=json.loads(txt)
+    except json.JSONDecodeError:
+        m=re.search(r"\[.*]", txt, re.S)
+        if not m: return None
+        try: data=json.loads(m.group())
+        except json.JSONDecodeError: return None
+    arr=data.get("items",[]) if isinstance(data,dict) else data
+    if not isinstance(arr,list): return None
+    return [q for q in map(_quiz_item,arr) if q]
+
+def quiz_raw(title:str, syn:str, lv:str, variant:int=0, need:int=QUIZ_ITEMS, avoid=(), nonce=None)->str:
+    # variant>0: 사전 생성 시 서로 다른 문제 세트를 받기 위한 변형(캐시 키도 달라짐). avoid: 이미 확보한 문항. nonce: gpt() 참고
+    style={"쉬움":"쉽고 명확, 지문 그대로","기본":"핵심 사건 이해","심화":"추론/관계"}[lv]
+    extra=f" 문제 세트 {variant+1}: 앞 세트와 겹치지 않는 장면으로." if variant else ""
+    if avoid: extra+=" 다음 문제와 겹치지 않게: "+" / ".join(avoid)
+    return gpt([{"role":"user","content":f"책 '{title}' 줄거리 기반 {need}문항 4지선다. question/options(4)/correct_answer(1~4). 난이도:{lv}, 스타일:{style}. 정답 번호 분포 고르게.{extra}\n\n줄거리:\n{syn}"}],
+               level_params(lv)['temp'],900,kind="quiz",nonce=nonce,response_format=QUIZ_SCHEMA,
+               valid=lambda r: len(parse_quiz_items(r) or [])>=need)
+
+@st.cache_resource
+def quiz_stats():
+    return collections.Counter()   # requests / rounds / parse_fail / items_ok / items_bad / failed
+
+def generate_quiz(title:str, syn:str, lv:str, variant:int=0, n:int=QUIZ_ITEMS, max_rounds:int=QUIZ_MAX_ROUNDS, nonce=None)->list:
+    """유효한 문항만 모으고, 모자란 개수만 다시 요청. n개를 못 채우면 []. nonce가 있으면 캐시된 퀴즈 대신 새로 만듦."""
+    stats=quiz_stats(); stats["requests"]+=1
+    items=[]
+    for _ in range(max_rounds):
+        need=n-len(items)
+        if need<=0: break
+        stats["rounds"]+=1
+        got=parse_quiz_items(quiz_raw(title,syn,lv,variant,need,[q["question"] for q in items],nonce))
+        if got is None: stats["parse_fail"]+=1; continue
+        seen={q["question"] for q in items}
+        fresh=[q for q in got if q["question"] not in seen][:need]
+        stats["items_ok"]+=len(fresh); stats["items_bad"]+=max(need-len(fresh),0)
+        items+=fresh
+    if len(items)<n: stats["failed"]+=1; return []
+    return items
+
+def reshuffle_quiz(quiz:list)->list:
+    out=[]
+    for it in quiz:
+        opts=it["options"][:]; correct_txt=opts[it["correct_answer"]-1]
+        random.shuffle(opts)
+        out.append({"question":it["question"],"options":opts,"correct_answer":opts.index(correct_txt)+1})
+    return out
+
+# 난이도 조절
+def level_params(level:str):
+    if level=="쉬움": return dict(temp=0.25, explain_len=900, debate_rounds=4, language="아주 쉬운 말", penalties=False)
+    if level=="심화": return dict(temp=0.5, explain_len=1700, debate_rounds=6, language="정확하고 논리적인 말", penalties=True)
+    return dict(temp=0.35, explain_len=1300, debate_rounds=6, language="친절한 말", penalties=False)
+
+#  토론 주제 추천
+def _normalize_topic_form(s: str, prefer_ought: bool = False) -> str:
+    s = (s or "").strip()
+    s = re.sub(r"[?？]+$", "", s)
+    s = re.sub(r"(인가요|일까요|맞을까요|좋을까요|될까요|될까|요)$", "", s).strip()
+    if "옳" in s or "것이 옳" in s:
+        s = re.sub(r"(옳[^\s\.\)]*)$", "옳다", s)
+        if not s.endswith("옳다."): s = s.rstrip(".") + "옳다."
+        return s
+    if not s.endswith("해야 한다.") and not s.endswith("하는 것이 옳다."):
+        s = s.rstrip(".") + (" 하는 것이 옳다." if prefer_ought else " 해야 한다.")
+    return s
+
+def _parse_topics(raw:str)->list:
+    try: return [clean_html(x).strip() for x in json.loads(strip_fence(raw)) if isinstance(x, str)]
+    except: return []
+
+def recommend_topics(title, syn, level, avoid:list, tries=2, nonce=None):
+    # nonce: 같은 책에서 '다시 추천'할 때 캐시된 같은 주제가 또 나오지 않게 (gpt() 참고)
+    base_prompt=(f"너는 초등 독서토론 교사야. 아래 책 '{title}'의 줄거리를 바탕으로 토론 주제 2개를 추천."
+                 f" 각 주제는 '…해야 한다.' 또는 '…하는 것이 옳다.'로 끝나는 문장. JSON 배열만.\n\n줄거리:\n{syn[:1600]}")
+    for _ in range(tries):
+        raw = gpt([{"role":"user","content":base_prompt}], t=0.5, mx=360, kind="recommend_topics", nonce=nonce,
+                  valid=lambda r: len(_parse_topics(r)) >= 2)
+        arr = _parse_topics(raw)
+        if len(arr) >= 2:
+            return [_normalize_topic_form(arr[0], False), _normalize_topic_form(arr[1], True)]
+    return ["약속을 지켜야 한다.", "힘들 때 도움을 요청하는 것이 옳다."]
+
+#  관련 낱말 
+def related_words(word:str, level:str)->dict:
+    prompt=(f"단어 '{word}' 관련 낱말을 초등 {level} 수준으로 JSON만 출력:"
+            "{\"meaning\":\"쉬운뜻1문장\",\"synonyms\":[5~8],\"antonyms\":[5~8],\"examples\":[\"문장1\",\"문장2\"]}")
+    raw=gpt([{"role":"user","content":prompt}],0.25,360,kind="related_words",valid=_json_ok)
+    try:
+        data=json.loads(strip_fence(raw))
+        data["meaning"]=str(data.get("meaning","")).strip()
+        data["synonyms"]=[str(x).strip() for x in data.get("synonyms",[])]
+        data["antonyms"]=[str(x).strip() for x in data.get("antonyms",[])]
+        data["examples"]=[str(x).strip() for x in data.get("examples",[])]
+        return data
+    except:
+        return {"meaning":"(설명 생성 실패)","synonyms":[],"antonyms":[],"examples":[]}
+
+#  독서토론 TXT 생성 
+def build_debate_txt_bytes(title:str, topic:str, user_side:str, transcript:list, score:dict, feedback_text:str):
+    txt="독서토론 기록\n\n"
+    txt+=f"[책] {title}\n[주제] {topic}\n[학생 입장] {user_side}\n\n"
+    if score:
+        txt+=f"[점수] 찬성 {score.get('pro',{}).get('total','-')}점 / 반대 {score.get('con',{}).get('total','-')}점, 승리: {score.get('winner','-')}\n\n"
+    txt+="[총평]\n"+(feedback_text or "")+"\n\n[토론 로그]\n"+"\n".join(transcript)
+    return txt.encode("utf-8"), "text/plain", "debate_record.txt"
+
+#  추천 도서 
+def fetch_grade_recs(grade:int):
+    qs = [f"초등 {grade}학년 동화 추천", f"초등 {grade}학년 소설 추천"]
+    seen = set(); out=[]
+    for res in run_parallel([functools.partial(nv_search, q) for q in qs], timeout=20, default=[]):
+        for b in res:
+            key = clean_html(b.get("title","")).strip()
+            if key and key not in seen:
+                seen.add(key); out.append(b)
+    return out[:5]
+
+#  도서 사전 생성: 줄거리(3난이도)·검증된 퀴즈 세트·토론 주제를 미리 만들어 두고 책 선택 시 바로 꺼내 씀
+LEVELS = ["쉬움","기본","심화"]
+CATALOG_QUIZ_SETS = 3
+
+def catalog_get(b:dict, level:str):
+    with _db().read() as conn:
+        row=conn.execute("SELECT synopsis, quizzes, topics FROM book_catalog WHERE book_key=? AND level=?", (book_key(b), level)).fetchone()
+    if not row or not row[0]: return None
+    return {"synopsis":row[0], "quizzes":json.loads(row[1] or "[]"), "topics":json.loads(row[2] or "[]")}
+
+def precompute_book(b:dict, levels=LEVELS, quiz_sets:int=CATALOG_QUIZ_SETS, force:bool=False):
+    title=clean_html(b.get("title",""))
+    todo=[lv for lv in levels if force or not (c:=catalog_get(b,lv)) or len(c["quizzes"])<quiz_sets]
+    if not todo: return
+    base=synopsis(title,b)
+    syns=run_parallel([functools.partial(elem_syn,title,base,lv) for lv in todo], timeout=300)
+    for lv,syn in zip(todo,syns):
+        if not syn: continue
+        *quizzes, topics = run_parallel([functools.partial(generate_quiz,title,syn,lv,i) for i in range(quiz_sets)]
+                                        +[functools.partial(recommend_topics,title,syn,lv,[])], timeout=300)
+        quizzes=[q for q in quizzes if q]
+        with _db().tx() as conn:
+            conn.execute("""INSERT OR REPLACE INTO book_catalog(book_key, level, title, synopsis, quizzes, topics, updated_at)
+                            VALUES (?,?,?,?,?,?,?)""",
+                         (book_key(b), lv, title, syn, json.dumps(quizzes,ensure_ascii=False),
+                          json.dumps(topics or [],ensure_ascii=False), datetime.datetime.now().isoformat()))
+
+class PrecomputeJob:
+    """학년별 추천 도서를 받아 차례로 precompute_book — 수업 전에 백그라운드로 돌려 둠."""
+    def __init__(self, grades=(3,4,5,6)):
+        self.grades=list(grades); self.total=0; self.done=0; self.current=""; self.errors=[]; self.finished=False
+        threading.Thread(target=self._run, name="precompute", daemon=True).start()
+
+    def _run(self):
+        try:
+            books=[b for g in self.grades for b in fetch_grade_recs(g)]
+            self.total=len(books)
+            for b in books:
+                self.current=clean_html(b.get("title",""))
+                try:
+                    with llm_priority_as(PRIO_BATCH): precompute_book(b)
+                except Exception as e: self.errors.append(f"{self.current}: {e}")
+                self.done+=1
+        except Exception as e:
+            self.errors.append(str(e))
+        self.finished=True
+
+@st.cache_resource
+def _precompute_slot():
+    return {"job": None}
@@ -0,0 +1,48 @@
+# 북클라이밍 · 표지 이미지
+
+import streamlit as st, base64, time, mimetypes, uuid, os, io, hashlib, requests
+
+#  표지 이미지: 제한된 재시도로 받아 비전 입력용 작은 JPEG로 줄여 디스크에 캐시, 같은 책은 data URL 재사용
+COVER_CACHE_DIR    = ".cache/covers"
+COVER_MAX_PX       = 512
+COVER_JPEG_QUALITY = 80
+
+def fetch_bytes(url:str, tries:int=3, timeout:float=5):
+    for attempt in range(tries):
+        try:
+            r=requests.get(url,timeout=timeout); r.raise_for_status(); return r.content
+        except Exception:
+            if attempt==tries-1: return None
+            time.sleep(0.5*2**attempt)
+
+def shrink_jpeg(raw:bytes, max_px:int=COVER_MAX_PX, quality:int=COVER_JPEG_QUALITY, gray:bool=False):
+    # 실패(디코딩 불가·Pillow 없음)하면 None
+    try:
+        from PIL import Image, ImageOps
+        im=ImageOps.exif_transpose(Image.open(io.BytesIO(raw)))
+        im=im.convert("L" if gray else "RGB"); im.thumbnail((max_px,max_px))
+        buf=io.BytesIO(); im.save(buf,"JPEG",quality=quality,optimize=True)
+        return buf.getvalue()
+    except Exception:
+        return None
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def cover_data_url(url:str):
+    # 받지 못하면 예외로 — st.cache_data는 예외를 캐시하지 않으므로 일시적인 실패가 1시간 동안 굳지 않음(to_data_url이 None으로)
+    path=os.path.join(COVER_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest()+".jpg")
+    if os.path.exists(path):
+        with open(path,"rb") as f: return "data:image/jpeg;base64,"+base64.b64encode(f.read()).decode()
+    raw=fetch_bytes(url)
+    if raw is None: raise ConnectionError(f"표지 이미지를 받지 못함: {url}")
+    small=shrink_jpeg(raw)
+    if small is None:   # 줄이지 못하면 원본 그대로(디스크 캐시는 생략)
+        return f"data:{mimetypes.guess_type(url)[0] or 'image/jpeg'};base64,{base64.b64encode(raw).decode()}"
+    os.makedirs(COVER_CACHE_DIR, exist_ok=True)
+    tmp=f"{path}.{uuid.uuid4().hex}"
+    with open(tmp,"wb") as f: f.write(small)
+    os.replace(tmp,path)
+    return "data:image/jpeg;base64,"+base64.b64encode(small).decode()
+def to_data_url(url):
+    if not url: return None
+    try: return cover_data_url(url)
+    except ConnectionError: return None
@@ -0,0 +1,149 @@
+# 북클라이밍 · GitHub 동기화
+
+import streamlit as st, json, time, uuid, datetime, random, os, threading, requests
+from ..config import GH_BRANCH, GH_REPO, GITHUB_TOKEN
+from ..storage import _db
+
+def _gh_enabled() -> bool:
+    return bool(GITHUB_TOKEN and GITHUB_TOKEN != "ghp_" and GH_REPO and GH_BRANCH)
+
+def _gh_headers():
+    return {"Authorization": f"token {GITHUB_TOKEN}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28"}
+
+# GitHub 동기화 큐: 기록을 로컬 outbox 테이블에 쌓아두고 N건/T초마다 한 커밋으로 묶어 올림
+GH_SYNC_BATCH    = int(st.secrets.get("GH_SYNC_BATCH",      20))
+GH_SYNC_INTERVAL = float(st.secrets.get("GH_SYNC_INTERVAL", 30))
+GH_SYNC_MAX_BACKOFF = float(st.secrets.get("GH_SYNC_MAX_BACKOFF", 600))   # 실패가 이어질 때 재시도 간격 상한(초)
+GH_REJECTED = (400, 413, 422)   # tree POST가 이 코드면 네트워크가 아니라 내용 문제 → 같은 묶음을 다시 보내도 소용없음
+
+def _gh_segment_path(path:str)->str:
+    # data/events.jsonl → data/events/20250908-144720-1a2b3c4d.jsonl (배치마다 새 파일 → 업로드 크기 = 새 기록 크기)
+    base, ext = os.path.splitext(path)
+    return f"{base}/{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}{ext or '.jsonl'}"
+
+def gh_commit_files(files:dict, message:str, tries:int=4):
+    """{경로: 내용}을 Git Data API로 한 커밋에 올림. 다른 반이 먼저 커밋해 ref가 어긋나면 새 head 위에 다시 쌓아 재시도.
+    (ok, 메시지)를 돌려주고, ok가 None이면 GitHub가 내용을 거절한 것(다시 보내도 같은 결과)."""
+    api = f"https://api.github.com/repos/{GH_REPO}/git"
+    for attempt in range(tries):
+        ref = requests.get(f"{api}/ref/heads/{GH_BRANCH}", headers=_gh_headers(), timeout=10)
+        if ref.status_code != 200:
+            return False, f"ref GET failed: {ref.status_code}"
+        head = ref.json()["object"]["sha"]
+        base = requests.get(f"{api}/commits/{head}", headers=_gh_headers(), timeout=10)
+        if base.status_code != 200:
+            return False, f"commit GET failed: {base.status_code}"
+        tree = requests.post(f"{api}/trees", headers=_gh_headers(), timeout=20,
+                             json={"base_tree": base.json()["tree"]["sha"],
+                                   "tree": [{"path":p, "mode":"100644", "type":"blob", "content":c} for p,c in files.items()]})
+        if tree.status_code != 201:
+            return (None if tree.status_code in GH_REJECTED else False), f"tree POST failed: {tree.status_code}"
+        commit = requests.post(f"{api}/commits", headers=_gh_headers(), timeout=10,
+                               json={"message": message, "tree": tree.json()["sha"], "parents": [head]})
+        if commit.status_code != 201:
+            return False, f"commit POST failed: {commit.status_code}"
+        upd = requests.patch(f"{api}/refs/heads/{GH_BRANCH}", headers=_gh_headers(), timeout=10,
+                             json={"sha": commit.json()["sha"], "force": False})
+        if upd.status_code == 200:
+            return True, commit.json()["sha"]
+        if upd.status_code not in (409, 422):
+            return False, f"ref PATCH failed: {upd.status_code}"
+        time.sleep(0.5 * 2**attempt + random.random() * 0.3)   # non-fast-forward → rebase 후 재시도
+    return False, "ref conflict: retries exhausted"
+
+class GhSyncQueue:
+    """save_event/save_student 기록을 gh_outbox에 쌓고, 백그라운드 스레드가 묶어서 커밋한다.
+    실패하면 간격을 두 배씩 늘려(상한 GH_SYNC_MAX_BACKOFF) 다시 시도하고, 내용이 거절된 묶음은 반씩 나눠 보내
+    끝내 혼자서도 거절되는 기록만 gh_deadletter로 옮긴다 — 한 줄 때문에 뒤의 기록이 영영 막히지 않게."""
+    def __init__(self, db, batch:int=GH_SYNC_BATCH, interval:float=GH_SYNC_INTERVAL, max_backoff:float=GH_SYNC_MAX_BACKOFF):
+        self.db, self.batch, self.interval, self.max_backoff = db, batch, interval, max_backoff
+        self.wake = threading.Event(); self.lock = threading.Lock()
+        self.limit = batch                  # 이번에 보낼 묶음 크기 (거절되면 반으로, 성공하면 두 배로 batch까지)
+        self.streak, self.retry_at = 0, 0.0 # 연달아 실패한 횟수, 그 전엔 다시 보내지 않을 시각
+        self.stats = {"flushed":0, "commits":0, "failures":0, "deadletter":0, "last_flush_s":None, "last_error":""}
+        threading.Thread(target=self._run, name="gh-sync", daemon=True).start()
+
+    def put(self, path:str, record:dict):
+        with self.db.tx() as conn:
+            conn.execute("INSERT INTO gh_outbox(path, line, queued_at) VALUES (?,?,?)",
+                         (path, json.dumps(record, ensure_ascii=False), time.time()))
+        if self.depth() >= self.batch: self.wake.set()
+
+    def depth(self)->int:
+        with self.db.read() as conn:
+            return conn.execute("SELECT COUNT(*) FROM gh_outbox").fetchone()[0]
+
+    def oldest_age(self)->float:
+        with self.db.read() as conn:
+            t = conn.execute("SELECT MIN(queued_at) FROM gh_outbox").fetchone()[0]
+        return time.time() - t if t else 0.0
+
+    def _run(self):
+        while True:
+            self.wake.wait(timeout=min(5.0, self.interval)); self.wake.clear()
+            if time.time() < self.retry_at: continue
+            try:
+                while self.depth() >= self.batch or (self.depth() and self.oldest_age() >= self.interval):
+                    if not self.flush(): break
+            except Exception as e:
+                self._failed(str(e))
+
+    def _failed(self, msg:str):
+        # 연결·서버·권한 문제: 기록은 그대로 두고 interval, 2×, 4×… 뒤에 다시 (여러 반이 같은 때 몰리지 않게 흔들어 줌)
+        self.streak += 1
+        self.stats["failures"] += 1; self.stats["last_error"] = msg[:200]
+        delay = self.interval * 2**min(self.streak-1, 30) * (0.8 + random.random() * 0.4)
+        self.retry_at = time.time() + min(self.max_backoff, delay)
+
+    def flush(self)->bool:
+        with self.lock:
+            with self.db.read() as conn:
+                rows = conn.execute("SELECT id, path, line FROM gh_outbox ORDER BY id LIMIT ?", (self.limit,)).fetchall()
+            if not rows: return True
+            lines = {}
+            for _, path, line in rows: lines.setdefault(path, []).append(line)
+            files = {_gh_segment_path(path): "\n".join(ls) + "\n" for path, ls in lines.items()}
+            t0 = time.perf_counter()
+            ok, msg = gh_commit_files(files, f"Append JSONL batch: {len(rows)} records")
+            self.stats["last_flush_s"] = round(time.perf_counter() - t0, 3)
+            if ok is None and len(rows) > 1:
+                self.limit = max(1, len(rows)//2)   # 거절된 묶음 → 반씩 나눠 거절되는 기록을 찾음
+                self.stats["last_error"] = msg[:200]
+                return True
+            if ok is None:
+                with self.db.tx() as conn:
+                    conn.execute("""INSERT OR REPLACE INTO gh_deadletter(id, path, line, queued_at, failed_at, error)
+                                    SELECT id, path, line, queued_at, ?, ? FROM gh_outbox WHERE id=?""", (time.time(), msg, rows[0][0]))
+                    conn.execute("DELETE FROM gh_outbox WHERE id=?", (rows[0][0],))
+                self.stats["deadletter"] += 1; self.stats["last_error"] = msg[:200]
+                self.limit = self.batch
+                return True
+            if not ok:
+                self._failed(msg)
+                return False
+            ids = [r[0] for r in rows]
+            with self.db.tx() as conn:
+                conn.execute(f"DELETE FROM gh_outbox WHERE id IN ({','.join('?'*len(ids))})", ids)
+            self.stats["flushed"] += len(rows); self.stats["commits"] += 1
+            self.limit, self.streak, self.retry_at = min(self.batch, self.limit*2), 0, 0.0   # 나눠 보내던 중이면 조금씩 다시 키움
+            return True
+
+    def deadletter(self)->int:
+        with self.db.read() as conn:
+            return conn.execute("SELECT COUNT(*) FROM gh_deadletter").fetchone()[0]
+
+    def metrics(self)->dict:
+        return {"depth": self.depth(), "oldest_age_s": round(self.oldest_age(), 1), "parked": self.deadletter(),
+                "retry_in_s": round(max(0.0, self.retry_at - time.time()), 1), **self.stats}
+
+@st.cache_resource
+def gh_sync_queue():
+    return GhSyncQueue(_db()) if _gh_enabled() else None
+
+def gh_enqueue(path:str, record:dict):
+    q = gh_sync_queue()
+    if q is None: return
+    try: q.put(path, record)
+    except Exception as e: st.warning(f"GitHub 동기화 대기열 오류: {e}")
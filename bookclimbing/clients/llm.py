@@ -0,0 +1,236 @@
+# 북클라이밍 · OpenAI 호출
+
+import streamlit as st, json, time, datetime, random, threading, hashlib, collections, concurrent.futures, heapq, itertools
+from ..config import DAY, OPENAI_API_KEY
+from ..util import llm_priority
+from ..storage import _db
+
+#  클라이언트: 처음 쓸 때 한 번만 만들어 프로세스 전체가 공유 (openai 패키지 임포트도 그때)
+@st.cache_resource
+def openai_client():
+    from openai import OpenAI
+    return OpenAI(api_key=OPENAI_API_KEY, max_retries=0)   # 재시도는 LLMScheduler가 맡음
+
+#  LLM 응답 캐시: 메모리 LRU → 디스크(SQLite) 2단. 키 = 정규화된 messages + 모델 + temperature + max_tokens
+LLM_MODEL = "gpt-4.1"
+LLM_CACHE_MEM_SIZE = 512
+# 용도별 보관 기간(초). None이면 캐시하지 않음(표지 대화·토론처럼 매번 달라야 하는 대화형 호출)
+LLM_CACHE_TTL = {
+    "elem_syn": 30*DAY, "related_words": 30*DAY, "vocab": 30*DAY, "rewrite_polite": 30*DAY,
+    "recommend_topics": 7*DAY, "quiz": 1*DAY, "explain": 1*DAY, "chat_summary": 1*DAY,
+    "cover_chat": None, "debate_turn": None, "debate_score": None, "debate_feedback": None, "essay_feedback": None,
+}
+
+def _llm_cache_key(msg, t, mx, extra=None)->str:
+    norm = [{"role": m["role"], "content": m["content"].strip() if isinstance(m["content"], str) else m["content"]} for m in msg]
+    body = {"model": LLM_MODEL, "t": round(float(t), 3), "mx": mx, "messages": norm}
+    if extra: body["extra"] = extra
+    raw = json.dumps(body, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    def __init__(self, db, size:int=LLM_CACHE_MEM_SIZE):
+        self.db, self.size = db, size
+        self.mem = collections.OrderedDict(); self.lock = threading.Lock()
+        self.stats = collections.Counter()   # (kind, "mem"|"disk"|"miss"|"bypass") → 횟수
+        with db.tx() as conn: conn.execute("DELETE FROM llm_cache WHERE expires<?", (time.time(),))
+
+    def _remember(self, key, value, expires):
+        with self.lock:
+            self.mem[key] = (value, expires); self.mem.move_to_end(key)
+            while len(self.mem) > self.size: self.mem.popitem(last=False)
+
+    def get(self, key:str, kind:str):
+        now = time.time()
+        with self.lock:
+            hit = self.mem.get(key)
+            if hit and hit[1] > now:
+                self.mem.move_to_end(key); self.stats[kind,"mem"] += 1
+                return hit[0]
+        with self.db.read() as conn:
+            row = conn.execute("SELECT value, expires FROM llm_cache WHERE key=? AND expires>?", (key, now)).fetchone()
+        if row:
+            self._remember(key, *row); self.stats[kind,"disk"] += 1
+            return row[0]
+        self.stats[kind,"miss"] += 1
+        return None
+
+    def put(self, key:str, kind:str, value:str, ttl:float):
+        expires = time.time() + ttl
+        self._remember(key, value, expires)
+        with self.db.tx() as conn:
+            conn.execute("INSERT OR REPLACE INTO llm_cache(key, kind, value, expires) VALUES (?,?,?,?)", (key, kind, value, expires))
+
+    def metrics(self)->list:
+        kinds = sorted({k for k, _ in self.stats})
+        rows = []
+        for k in kinds:
+            mem, disk, miss, bypass = (self.stats[k,x] for x in ("mem","disk","miss","bypass"))
+            hits = mem + disk
+            rows.append({"용도":k, "메모리 적중":mem, "디스크 적중":disk, "미스":miss, "캐시 안 함":bypass,
+                         "적중률(%)": round(100*hits/(hits+miss),1) if hits+miss else None})
+        return rows
+
+@st.cache_resource
+def llm_cache():
+    return LLMCache(_db())
+
+#  LLM 계측: 호출 용도(kind)별 토큰·소요 시간·오류를 llm_metrics 테이블에 (운영 현황 페이지에서 p50/p95)
+def record_llm_call(kind:str, t0:float, usage=None, error=None, cached:bool=False, ttft_ms=None):
+    ms = (time.perf_counter()-t0)*1000
+    try:
+        with _db().tx() as conn:
+            conn.execute("""INSERT INTO llm_metrics(ts, day, kind, model, prompt_tokens, completion_tokens, ms, ttft_ms, ok, error, cached)
+                            VALUES (?,?,?,?,?,?,?,?,?,?,?)""",
+                         (time.time(), datetime.date.today().isoformat(), kind, LLM_MODEL,
+                          getattr(usage,"prompt_tokens",None), getattr(usage,"completion_tokens",None),
+                          round(ms,1), round(ttft_ms,1) if ttft_ms is not None else None,
+                          int(error is None), f"{type(error).__name__}: {error}"[:300] if error else "", int(cached)))
+    except Exception:
+        pass   # 계측이 실패해도 학생 활동은 계속
+
+#  LLM 스케줄러: 프로세스 공용 토큰 버킷(분당 요청 수) + 우선순위 대기 + 429/5xx 지수 백오프 + 같은 요청 합치기
+LLM_RPM      = int(st.secrets.get("LLM_RPM", 300))
+LLM_BURST    = 20
+LLM_RETRIES  = 4
+LLM_BACKOFF_MAX = 30
+
+def _llm_retry_after(e:Exception):
+    """재시도할 오류면 서버가 알려준 대기 시간(없으면 0), 아니면 None"""
+    from openai import RateLimitError, APIStatusError, APIConnectionError   # fn()이 OpenAI 호출이면 이미 로드돼 있음
+    if isinstance(e, APIConnectionError): return 0
+    if isinstance(e, RateLimitError) or (isinstance(e, APIStatusError) and e.status_code >= 500):
+        try: return float(e.response.headers.get("retry-after") or 0)
+        except Exception: return 0
+    return None
+
+class LLMScheduler:
+    def __init__(self, rpm:int=LLM_RPM, burst:int=LLM_BURST):
+        self.rate, self.cap = rpm/60, burst
+        self.tokens, self.stamp = float(burst), time.monotonic()
+        self.cv = threading.Condition(); self.waiting = []; self.seq = itertools.count()
+        self.flights = {}; self.flight_lock = threading.Lock()
+        self.stats = collections.Counter()   # calls, retries, rate_limited, coalesced, waited_ms
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.cap, self.tokens + (now-self.stamp)*self.rate); self.stamp = now
+
+    def _acquire(self, prio:int):
+        # 대기열 맨 앞(우선순위 → 도착 순)만 토큰을 가져감
+        t0 = time.monotonic()
+        with self.cv:
+            ticket = (prio, next(self.seq)); heapq.heappush(self.waiting, ticket)
+            while True:
+                self._refill()
+                if self.waiting[0] == ticket and self.tokens >= 1:
+                    heapq.heappop(self.waiting); self.tokens -= 1; self.cv.notify_all()
+                    break
+                self.cv.wait(timeout=max((1-self.tokens)/self.rate, 0.01) if self.waiting[0] == ticket else 0.5)
+        self.stats["waited_ms"] += int((time.monotonic()-t0)*1000)
+
+    def submit(self, fn, prio:int=None):
+        """fn()을 토큰 하나 받고 실행, 429/5xx/연결 오류면 지수 백오프(지터 포함) 후 다시"""
+        prio = llm_priority() if prio is None else prio
+        for attempt in range(LLM_RETRIES+1):
+            self._acquire(prio); self.stats["calls"] += 1
+            try: return fn()
+            except Exception as e:
+                wait = _llm_retry_after(e)
+                if wait is None or attempt == LLM_RETRIES: raise
+                if getattr(e, "status_code", None) == 429:   # RateLimitError
+                    self.stats["rate_limited"] += 1
+                    with self.cv: self.tokens = min(self.tokens, 0)   # 다른 호출도 잠시 쉬게
+                self.stats["retries"] += 1
+                time.sleep(max(wait, min(LLM_BACKOFF_MAX, 2**attempt) * random.uniform(0.5, 1.0)))
+
+    def _claim(self, key:str):
+        # (future, leader): 처음 온 호출만 leader, 나머지는 그 future를 기다림. leader는 끝나면 _release
+        with self.flight_lock:
+            fut = self.flights.get(key); leader = fut is None
+            if leader: fut = self.flights[key] = concurrent.futures.Future()
+        if not leader: self.stats["coalesced"] += 1
+        return fut, leader
+
+    def _release(self, key:str):
+        with self.flight_lock: self.flights.pop(key, None)
+
+    def single_flight(self, key:str, fn):
+        """같은 key로 진행 중인 호출이 있으면 그 결과를 기다려 같이 씀"""
+        fut, leader = self._claim(key)
+        if not leader: return fut.result()
+        try:
+            out = fn(); fut.set_result(out); return out
+        except BaseException as e:
+            fut.set_exception(e); raise
+        finally:
+            self._release(key)
+
+    def metrics(self)->dict:
+        with self.cv: self._refill(); tokens, waiting = self.tokens, len(self.waiting)
+        return {**self.stats, "tokens": round(tokens,1), "waiting": waiting, "in_flight": len(self.flights)}
+
+@st.cache_resource
+def llm_scheduler():
+    return LLMScheduler()
+
+#  호출
+def gpt(msg,t=0.5,mx=800,kind="chat",valid=None,nonce=None,**kw):
+    # kind: 호출 용도(캐시 TTL 선택). valid(out)가 False인 응답은 캐시에 남기지 않아 재시도 시 새로 생성됨
+    # nonce: 학생이 직접 '다시 만들기'를 했을 때 캐시 키에만 섞는 값(API로는 안 보냄) → 같은 프롬프트라도 새로 생성
+    # kw: response_format 등 API 옵션 그대로 전달(캐시 키에도 포함)
+    ttl=LLM_CACHE_TTL.get(kind); key=_llm_cache_key(msg,t,mx,{**kw,"nonce":nonce} if nonce else kw) if ttl else None
+    t0=time.perf_counter()
+    if key and (hit:=llm_cache().get(key,kind)) is not None:
+        record_llm_call(kind,t0,cached=True); return hit
+    if not key: llm_cache().stats[kind,"bypass"]+=1
+    def _fetch():
+        # 같은 key로 동시에 들어온 호출은 이 함수를 한 번만 실행하고 결과를 나눠 가짐
+        try: res=llm_scheduler().submit(lambda: openai_client().chat.completions.create(model=LLM_MODEL,messages=msg,temperature=t,max_tokens=mx,**kw))
+        except Exception as e:
+            record_llm_call(kind,t0,error=e); raise
+        record_llm_call(kind,t0,usage=getattr(res,"usage",None))
+        out=res.choices[0].message.content.strip()
+        if key and (valid is None or valid(out)): llm_cache().put(key,kind,out,ttl)
+        return out
+    return llm_scheduler().single_flight(key,_fetch) if key else _fetch()
+def gpt_stream(msg,t=0.5,mx=800,kind="chat"):
+    # gpt()의 스트리밍판: 토큰이 오는 대로 yield(st.write_stream용), 다 받으면 전체 텍스트를 같은 키로 캐시
+    # 같은 key로 이미 스트리밍 중이면 그 호출이 끝나길 기다렸다가 같은 텍스트를 한 번에 yield
+    ttl=LLM_CACHE_TTL.get(kind); key=_llm_cache_key(msg,t,mx) if ttl else None
+    t0=time.perf_counter()
+    if key and (hit:=llm_cache().get(key,kind)) is not None:
+        record_llm_call(kind,t0,cached=True); yield hit; return
+    if not key: llm_cache().stats[kind,"bypass"]+=1
+    fut=None
+    if key:
+        fut,leader=llm_scheduler()._claim(key)
+        if not leader:
+            out=fut.result(); fut=None
+            if out is not None:
+                record_llm_call(kind,t0,cached=True)
+                if out: yield out
+                return
+            # 앞선 스트림이 중간에 버려짐(rerun 등) → 직접 받음
+    parts=[]; usage=None; ttft=None
+    try:
+        stream=llm_scheduler().submit(lambda: openai_client().chat.completions.create(model=LLM_MODEL,messages=msg,temperature=t,max_tokens=mx,
+                                                                                      stream=True,stream_options={"include_usage":True}))
+        for chunk in stream:
+            if getattr(chunk,"usage",None): usage=chunk.usage
+            if chunk.choices and (d:=chunk.choices[0].delta.content):
+                if ttft is None: ttft=(time.perf_counter()-t0)*1000
+                parts.append(d); yield d
+    except Exception as e:
+        record_llm_call(kind,t0,error=e)
+        if fut: fut.set_exception(e)
+        raise
+    else:
+        record_llm_call(kind,t0,usage=usage,ttft_ms=ttft)
+        out="".join(parts).strip()
+        if key and out: llm_cache().put(key,kind,out,ttl)
+        if fut: fut.set_result(out)
+    finally:
+        if fut:
+            if not fut.done(): fut.set_result(None)   # 끝까지 못 받음: 기다리던 호출은 각자 다시 받음
+            llm_scheduler()._release(key)
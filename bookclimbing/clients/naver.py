@@ -0,0 +1,143 @@
+# 북클라이밍 · 네이버 책 검색 · 책 소개 크롤러
+
+import streamlit as st, time, random, threading, collections, functools, urllib.parse, requests
+from ..config import DAY, NAVER_CLIENT_ID, NAVER_CLIENT_SECRET
+from ..util import IO_WORKERS
+from ..storage import _db
+from ..safety import is_adult_book
+
+# NAVER Books
+NAVER_BOOK_API  = "https://openapi.naver.com/v1/search/book.json"
+NAVER_CACHE_TTL = 6*3600
+
+class NaverBooksClient:
+    """keep-alive 세션 + 타임아웃 + 백오프 재시도 + (query, display, start) TTL 캐시.
+    캐시에는 성인 도서를 걸러낸 뒤의 결과를 넣으므로, 같은 검색어는 학교 전체가 한 번만 호출한다."""
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, client_id:str, client_secret:str, ttl:float=NAVER_CACHE_TTL,
+                 timeout:float=5, retries:int=3, max_entries:int=1024):
+        self.session = requests.Session()
+        self.session.headers.update({"X-Naver-Client-Id":client_id, "X-Naver-Client-Secret":client_secret})
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=IO_WORKERS))
+        self.ttl, self.timeout, self.retries, self.max_entries = ttl, timeout, retries, max_entries
+        self.cache = collections.OrderedDict(); self.lock = threading.Lock()
+        self.stats = collections.Counter()
+
+    def _get(self, params:dict)->list:
+        for attempt in range(self.retries):
+            try:
+                r = self.session.get(NAVER_BOOK_API, params=params, timeout=self.timeout)
+                if r.status_code == 200: return r.json().get("items", [])
+                if r.status_code not in self.RETRY_STATUS: r.raise_for_status()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries-1: raise
+            if attempt == self.retries-1: break   # 마지막 시도였으면 기다리지 않고 바로 실패
+            self.stats["retry"] += 1
+            time.sleep(0.5 * 2**attempt + random.random()*0.2)
+        raise RuntimeError("네이버 책 검색 재시도 초과")
+
+    def search(self, query:str, display:int=10, start:int=1)->list:
+        key = (query.strip(), display, start); now = time.time()
+        with self.lock:
+            hit = self.cache.get(key)
+            if hit and hit[0] > now:
+                self.cache.move_to_end(key); self.stats["hit"] += 1
+                return list(hit[1])
+        self.stats["miss"] += 1
+        items = [b for b in self._get({"query":key[0], "display":display, "start":start}) if not is_adult_book(b)]
+        with self.lock:
+            self.cache[key] = (now + self.ttl, items); self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries: self.cache.popitem(last=False)
+        return list(items)
+
+@st.cache_resource
+def naver_books():
+    return NaverBooksClient(NAVER_CLIENT_ID, NAVER_CLIENT_SECRET)
+
+def nv_search(q, display=10, start=1):
+    return naver_books().search(q, display, start)
+
+#  줄거리 크롤러: 네이버 책 페이지의 '책 소개'를 긁어 syn_cache 테이블에 (ISBN·제목 키, 못 찾은 결과도 짧게 캐시)
+SYN_SEARCH_URL = "https://book.naver.com/search/search.nhn"
+SYN_CACHE_TTL  = 30*DAY
+SYN_NEG_TTL    = 1*DAY
+SYN_LINK  = ("ul.list_type1 li a", "//ul[contains(concat(' ',normalize-space(@class),' '),' list_type1 ')]//li//a")
+SYN_INTRO = ("div.book_intro",     "//div[contains(concat(' ',normalize-space(@class),' '),' book_intro ')]")
+
+@functools.lru_cache(maxsize=None)
+def _html_backend()->str:
+    # 빠른 파서부터: selectolax → lxml → BeautifulSoup(html.parser)
+    for name, mod in (("selectolax","selectolax.parser"), ("lxml","lxml.html")):
+        try: __import__(mod); return name
+        except ImportError: pass
+    return "bs4"
+
+def html_first(html:str, sel:tuple, attr:str=None)->str:
+    """sel=(css, xpath) 로 첫 요소를 찾아 attr 값(attr 없으면 줄바꿈으로 이은 텍스트). 없으면 ''"""
+    backend = _html_backend()
+    if backend == "selectolax":
+        from selectolax.parser import HTMLParser
+        n = HTMLParser(html).css_first(sel[0])
+        if n is None: return ""
+        return (n.attributes.get(attr) or "") if attr else n.text(separator="\n")
+    if backend == "lxml":
+        import lxml.html
+        found = lxml.html.fromstring(html).xpath(sel[1])
+        if not found: return ""
+        return (found[0].get(attr) or "") if attr else "\n".join(found[0].itertext())
+    from bs4 import BeautifulSoup
+    n = BeautifulSoup(html, "html.parser").select_one(sel[0])
+    if n is None: return ""
+    return (n.get(attr) or "") if attr else n.get_text("\n")
+
+class SynopsisCrawler:
+    """ISBN으로 먼저, 없으면 제목으로 검색해 책 소개를 가져옴. 출처(isbn/title)별 성공·빈 결과·오류를 셈."""
+    def __init__(self, db, timeout:float=8):
+        self.db, self.timeout = db, timeout
+        self.session = requests.Session(); self.session.headers.update({"User-Agent":"Mozilla/5.0"})
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=IO_WORKERS))
+        self.stats = collections.Counter()   # "hit" / (source, "ok"|"empty"|"error")
+
+    def _fetch(self, query:str)->str:
+        r = self.session.get(SYN_SEARCH_URL, params={"query":query}, timeout=self.timeout); r.raise_for_status()
+        href = html_first(r.text, SYN_LINK, "href")
+        if not href: return ""
+        r = self.session.get(urllib.parse.urljoin(SYN_SEARCH_URL, href), timeout=self.timeout); r.raise_for_status()
+        return html_first(r.text, SYN_INTRO).strip()
+
+    def get(self, title:str, isbn:str=None)->str:
+        title = " ".join((title or "").split())
+        key = f"isbn:{isbn}" if isbn else f"title:{title}"
+        with self.db.read() as conn:
+            row = conn.execute("SELECT intro FROM syn_cache WHERE key=? AND expires>?", (key, time.time())).fetchone()
+        if row: self.stats["hit"] += 1; return row[0]
+        intro, source, failed = "", "", False
+        for source, q in (("isbn", isbn), ("title", title)):
+            if not q: continue
+            try: intro = self._fetch(q)
+            except Exception:
+                self.stats[source,"error"] += 1; failed = True; continue
+            self.stats[source,"ok" if intro else "empty"] += 1
+            if intro: break
+        if intro or not failed:   # 네트워크 오류뿐이었으면 캐시하지 않고 다음에 다시
+            with self.db.tx() as conn:
+                conn.execute("INSERT OR REPLACE INTO syn_cache(key, title, intro, source, expires) VALUES (?,?,?,?,?)",
+                             (key, title, intro, source if intro else "", time.time() + (SYN_CACHE_TTL if intro else SYN_NEG_TTL)))
+        return intro
+
+    def metrics(self)->list:
+        rows = []
+        for s in ("isbn","title"):
+            ok, empty, err = (self.stats[s,x] for x in ("ok","empty","error"))
+            if ok+empty+err:
+                rows.append({"출처":s, "성공":ok, "빈 결과":empty, "오류":err, "성공률(%)":round(100*ok/(ok+empty+err),1)})
+        return rows
+
+@st.cache_resource
+def syn_crawler():
+    return SynopsisCrawler(_db())
+
+def crawl_syn(title, isbn=None):
+    try: return syn_crawler().get(title, isbn)
+    except Exception: return ""
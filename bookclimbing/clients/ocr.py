@@ -0,0 +1,53 @@
+# 북클라이밍 · 손글씨 OCR
+
+import streamlit as st, base64, time, uuid, hashlib, concurrent.futures, requests
+from ..config import NAVER_OCR_SECRET
+from ..util import _io_pool
+from ..storage import _db
+from .covers import shrink_jpeg
+
+#  손글씨 OCR: 흑백·축소 JPEG로 줄여 CLOVA에 보내고, 결과는 원본 해시로 ocr_cache 테이블에
+#  (CLOVA General OCR은 요청당 이미지 1장만 받으므로 여러 장은 공용 풀에서 동시에 보냄)
+NAVER_CLOVA_OCR_URL = st.secrets.get("NAVER_CLOVA_OCR_URL")
+OCR_MAX_PX       = 1600
+OCR_JPEG_QUALITY = 85
+OCR_TIMEOUT      = 20
+
+def image_format(raw:bytes):
+    # 확장자 대신 파일 앞부분으로 판별. CLOVA가 받는 형식만
+    if raw[:3] == b"\xff\xd8\xff": return "jpg"
+    if raw[:8] == b"\x89PNG\r\n\x1a\n": return "png"
+    if raw[:4] in (b"II*\x00", b"MM\x00*"): return "tiff"
+    if raw[:5] == b"%PDF-": return "pdf"
+    return None
+
+def _clova_ocr(raw:bytes)->str:
+    data = shrink_jpeg(raw, OCR_MAX_PX, OCR_JPEG_QUALITY, gray=True); fmt = "jpg"
+    if data is None: data, fmt = raw, image_format(raw)   # 줄이지 못하면 원본 그대로
+    if fmt is None: raise ValueError("지원하지 않는 이미지 형식")
+    payload={"version":"V2","requestId":str(uuid.uuid4()),"timestamp":int(time.time()*1000),
+             "images":[{"name":"page","format":fmt,"data":base64.b64encode(data).decode()}]}
+    r=requests.post(NAVER_CLOVA_OCR_URL,headers={"X-OCR-SECRET":NAVER_OCR_SECRET,"Content-Type":"application/json"},json=payload,timeout=OCR_TIMEOUT)
+    r.raise_for_status()
+    fields=r.json()["images"][0]["fields"]
+    return "".join(f["inferText"]+("\n" if f.get("lineBreak") else " ") for f in fields).strip()
+
+def nv_ocr(img:bytes)->str:
+    if not NAVER_CLOVA_OCR_URL or not NAVER_OCR_SECRET: return "(OCR 설정 필요)"
+    h=hashlib.sha256(img).hexdigest()
+    with _db().read() as conn:
+        row=conn.execute("SELECT text FROM ocr_cache WHERE hash=?", (h,)).fetchone()
+    if row: return row[0]
+    try: text=_clova_ocr(img)
+    except ValueError as e: return f"({e})"
+    except Exception: return "(OCR 파싱 오류)"
+    with _db().tx() as conn:
+        conn.execute("INSERT OR REPLACE INTO ocr_cache(hash, text, ts) VALUES (?,?,?)", (h, text, time.time()))
+    return text
+
+def ocr_pages(pages:list, on_progress=None)->str:
+    """여러 장을 동시에 OCR 해 올린 순서대로 이어 붙임. on_progress(done, total)는 호출한 스레드에서 불림"""
+    futs=[_io_pool().submit(nv_ocr, p) for p in pages]
+    for n, _ in enumerate(concurrent.futures.as_completed(futs), 1):
+        if on_progress: on_progress(n, len(futs))
+    return "\n\n".join(f.result() for f in futs)
@@ -0,0 +1,18 @@
+# 북클라이밍 · 설정(secrets)
+
+import streamlit as st
+
+#  API 키
+OPENAI_API_KEY       = st.secrets["OPENAI_API_KEY"]
+NAVER_CLIENT_ID      = st.secrets["NAVER_CLIENT_ID"]
+NAVER_CLIENT_SECRET  = st.secrets["NAVER_CLIENT_SECRET"]
+NAVER_OCR_SECRET     = st.secrets.get("NAVER_OCR_SECRET","")
+
+# GitHub 설정
+GITHUB_TOKEN     = st.secrets.get("GITHUB_TOKEN",        "ghp_")
+GH_REPO          = st.secrets.get("GH_REPO",             "ManseJang/bookclimbing")
+GH_BRANCH        = st.secrets.get("GH_BRANCH",           "main")
+GH_EVENTS_PATH   = st.secrets.get("GH_EVENTS_PATH",      "data/events.jsonl")
+GH_STUDENTS_PATH = st.secrets.get("GH_STUDENTS_PATH",    "data/students.jsonl")
+
+DAY = 86400
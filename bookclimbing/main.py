@@ -0,0 +1,64 @@
+# 북클라이밍 · 화면 진입점
+
+import streamlit as st, importlib
+from .storage import startup_import
+from .pages.common import FONT_SIZES, student_panel, theme_css
+
+# 메뉴 → (pages 안의 모듈, 함수). 화면 모듈은 처음 열 때 불러옴(대시보드의 pandas 같은 무거운 임포트를 첫 화면에서 뺌)
+PAGES = {
+    "책 검색":("book","page_book"),
+    "단어 알아보기":("vocab","page_vocab"),
+    "독서 퀴즈":("quiz","page_quiz"),
+    "독서 토론":("discussion","page_discussion"),
+    "독서 감상문 피드백":("feedback","page_feedback"),
+    "포트폴리오/대시보드":("portfolio","page_portfolio_dashboard"),
+    "운영 현황":("admin","page_admin")
+}
+
+def load_page(name:str):
+    mod, fn = PAGES[name]
+    return getattr(importlib.import_module(f".pages.{mod}", __package__), fn)
+
+#  MAIN 
+def main():
+    st.set_page_config("북클라이밍","📚",layout="wide")
+    font_choice = st.session_state.get("ui_font_size_choice","보통")
+    st.markdown(theme_css(FONT_SIZES.get(font_choice,"16px")), unsafe_allow_html=True)
+    st.title("북클라이밍: 자기주도적 독서 습관 기르기[초등(3~6학년)]")
+
+    startup_import()
+    if "current_page" not in st.session_state: st.session_state.current_page="책 검색"
+    if "level" not in st.session_state: st.session_state.level="기본"
+
+    with st.sidebar:
+        st.link_button("ℹ️ 프로그램 사용법", "https://keithharingulsan.my.canva.site/bookclimbing")
+        student_panel()
+        st.markdown("### 메뉴")
+        menu_labels={
+            "책 검색":"📘 책 찾기 & 표지 이야기",
+            "단어 알아보기":"🧩 낱말 탐정",
+            "독서 퀴즈":"📝 이야기 퀴즈",
+            "독서 토론":"🗣️ 독서 생각 나누기",
+            "독서 감상문 피드백":"✍️ 독서 생각 성찰하기",
+            "포트폴리오/대시보드":"🎒 나의 독서 앨범",
+            "운영 현황":"🛠️ 운영 현황(교사용)"
+        }
+        if not st.secrets.get("ADMIN_PASSWORD",""): menu_labels.pop("운영 현황")   # 비밀번호를 정하지 않으면 메뉴에서 숨김
+        if st.session_state.current_page not in menu_labels: st.session_state.current_page="책 검색"
+        st.markdown('<div class="sidebar-radio">', unsafe_allow_html=True)
+        sel=st.radio("", list(menu_labels.keys()),
+                     format_func=lambda k: menu_labels[k],
+                     index=list(menu_labels).index(st.session_state.current_page),
+                     label_visibility="collapsed")
+        st.markdown('</div>', unsafe_allow_html=True)
+        st.session_state.current_page=sel
+
+        st.markdown("---")
+        try:
+            st.link_button("🌐 독서감상문 공유", "https://padlet.com/jangseman12/padlet-hgydovnuoecbyhi0")
+        except Exception:
+            st.markdown('<a class="linklike-btn" href="https://padlet.com/jangseman12/padlet-hgydovnuoecbyhi0" target="_blank">🌐 독서감상문 공유</a>', unsafe_allow_html=True)
+
+        if st.button("처음으로"): st.session_state.clear(); st.rerun()
+
+    load_page(st.session_state.current_page)()
@@ -0,0 +1,73 @@
+import streamlit as st, datetime
+import pandas as pd
+from ..storage import dash_cache, DASH_CACHE_SIZE, id_cache, _db
+from ..clients.llm import llm_cache, llm_scheduler
+from ..clients.github import gh_sync_queue
+from ..clients.naver import naver_books, syn_crawler, _html_backend
+from ..books import PrecomputeJob, quiz_stats, _precompute_slot
+
+#  PAGE 7 : 운영 현황 (교사·운영자용)
+def page_admin():
+    st.header("🛠️ 운영 현황")
+    pw=st.secrets.get("ADMIN_PASSWORD","")
+    if not pw:   # 비밀번호가 없으면 열지 않음(사전 생성은 LLM 사용량을 크게 씀)
+        st.warning("secrets에 ADMIN_PASSWORD를 설정해야 운영 현황을 볼 수 있습니다."); return
+    if st.text_input("관리자 비밀번호", type="password")!=pw:
+        st.info("관리자 비밀번호를 입력하세요."); return
+
+    st.subheader("🤖 활동별 LLM 사용량")
+    days=st.number_input("최근 며칠", min_value=1, max_value=90, value=7, step=1)
+    since=(datetime.date.today()-datetime.timedelta(days=int(days)-1)).isoformat()
+    with _db().read() as conn:
+        rows=conn.execute("""SELECT day, kind, ms, ttft_ms, prompt_tokens, completion_tokens, ok, cached
+                             FROM llm_metrics WHERE day>=?""", (since,)).fetchall()
+    df=pd.DataFrame(rows, columns=["day","kind","ms","ttft_ms","prompt_tokens","completion_tokens","ok","cached"])
+    # 스트리밍 호출이 없거나 전부 오류인 기간엔 열이 모두 None(object) → quantile/sum 전에 숫자형으로
+    num=["ms","ttft_ms","prompt_tokens","completion_tokens"]
+    df[num]=df[num].apply(pd.to_numeric, errors="coerce")
+    up=df[df["cached"]==0]
+    if up.empty:
+        st.info("이 기간의 LLM 호출 기록이 없습니다.")
+    else:
+        g=up.groupby(["day","kind"])
+        summary=pd.DataFrame({"호출":g.size(), "오류":g["ok"].apply(lambda x: int((x==0).sum())),
+                              "p50 ms":g["ms"].quantile(.5).round(), "p95 ms":g["ms"].quantile(.95).round(),
+                              "p50 첫 토큰 ms":g["ttft_ms"].quantile(.5).round(),
+                              "입력 토큰":g["prompt_tokens"].sum(), "출력 토큰":g["completion_tokens"].sum()})
+        summary["캐시 적중"]=df[df["cached"]==1].groupby(["day","kind"]).size().reindex(summary.index, fill_value=0)
+        st.dataframe(summary.reset_index().sort_values(["day","kind"], ascending=[False,True]).rename(columns={"day":"날짜","kind":"활동"}),
+                     use_container_width=True, hide_index=True)
+        st.markdown("**활동별 토큰 합계**")
+        st.bar_chart(up.groupby("kind")[["prompt_tokens","completion_tokens"]].sum())
+
+    st.subheader("🗄️ 캐시 · 외부 API")
+    rows = llm_cache().metrics()
+    if rows: st.markdown("**LLM 캐시 (이번 서버 실행 이후)**"); st.dataframe(pd.DataFrame(rows).set_index("용도"), use_container_width=True)
+    qs = quiz_stats()
+    if qs["requests"]:
+        st.caption(f"퀴즈 생성: {qs['requests']}회 · 호출 {qs['rounds']}회 · JSON 파싱 실패 {qs['parse_fail']} · "
+                   f"버린 문항 {qs['items_bad']} · 실패 {qs['failed']}")
+    sm = llm_scheduler().metrics()
+    st.caption(f"LLM 스케줄러: 호출 {sm.get('calls',0)} · 재시도 {sm.get('retries',0)}(429 {sm.get('rate_limited',0)}) · "
+               f"합친 요청 {sm.get('coalesced',0)} · 누적 대기 {sm.get('waited_ms',0)/1000:.1f}초 · 대기 중 {sm['waiting']} · 남은 토큰 {sm['tokens']}")
+    if rows:=syn_crawler().metrics():
+        st.markdown(f"**책 소개 크롤링** (캐시 적중 {syn_crawler().stats['hit']}회 · 파서 {_html_backend()})"); st.dataframe(pd.DataFrame(rows).set_index("출처"), use_container_width=True)
+    dc = dash_cache().stats
+    st.caption(f"대시보드 캐시: 적중 {dc['hit']} · 새 기록으로 다시 계산 {dc['stale']} · 처음 계산 {dc['miss']} · 보관 {len(dash_cache().data)}/{DASH_CACHE_SIZE}")
+    ic = id_cache()
+    st.caption(f"학생 키 캐시: 적중 {ic.stats['hit']} · 조회 {ic.stats['miss']} · 학생 {len(ic.students)}명 · 학교 {len(ic.schools)}곳")
+    nv = naver_books().stats
+    st.caption(f"네이버 책 검색 캐시: 적중 {nv['hit']} · 호출 {nv['miss']} · 재시도 {nv['retry']}")
+    if q:=gh_sync_queue():
+        m = q.metrics()
+        st.caption(f"GitHub 동기화: 대기 {m['depth']}건(가장 오래된 {m['oldest_age_s']}초) · 커밋 {m['commits']}회/{m['flushed']}건 · "
+                   f"최근 커밋 {m['last_flush_s']}초 · 실패 {m['failures']}(다음 시도까지 {m['retry_in_s']}초) · 거절되어 따로 둔 기록 {m['parked']}건")
+
+    st.subheader("📚 추천 도서 사전 생성")
+    slot = _precompute_slot(); job = slot["job"]
+    if job and not job.finished:
+        st.caption(f"사전 생성 중… {job.done}/{job.total or '?'} · {job.current}")
+        if st.button("진행 상황 새로고침"): st.rerun()
+    else:
+        if job: st.caption(f"사전 생성 완료: {job.done}권" + (f" (오류 {len(job.errors)}건)" if job.errors else ""))
+        if st.button("📚 추천 도서 사전 생성(3~6학년)"): slot["job"] = PrecomputeJob(); st.rerun()
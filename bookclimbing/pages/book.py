@@ -0,0 +1,140 @@
+import streamlit as st, functools
+from ..util import clean_html, run_parallel, _isbn
+from ..clients.llm import gpt
+from ..clients.covers import to_data_url
+from ..clients.naver import crawl_syn, nv_search
+from ..safety import contains_bad_language, rewrite_polite
+from ..books import catalog_get, elem_syn, fetch_grade_recs, level_params, synopsis
+from .common import fit_context, load_intro_path, render_img_percent, rerun_fragment, save_event
+
+#  책 선택
+def select_book_and_build(sel):
+    st.session_state.selected_book=sel
+    title=clean_html(sel["title"])
+    if cat:=catalog_get(sel, st.session_state.level):
+        st.session_state.synopsis=cat["synopsis"]
+    else:
+        base_syn=synopsis(title,sel)
+        box=st.empty()
+        with box.container():
+            st.subheader("📖 줄거리 만드는 중…")
+            st.session_state.synopsis=st.write_stream(elem_syn(title,base_syn,st.session_state.level,stream=True)).strip()
+        box.empty()
+    st.success(f"책 선택 완료! → {title}")
+    save_event("book",{
+        "title": title,
+        "author": clean_html(sel.get("author","")),
+        "level": st.session_state.level
+    })
+
+def render_reco_table(items:list):
+    h1,h2,h3 = st.columns([1,2,5])
+    with h1: st.markdown("**표지**")
+    with h2: st.markdown("**책 제목**")
+    with h3: st.markdown("**책 내용**")
+    st.markdown("<div style='height:8px;border-bottom:1px solid #e5e7eb;'></div>", unsafe_allow_html=True)
+    # 소개가 빈 책들의 크롤링을 한꺼번에 동시에
+    missing = [i for i,b in enumerate(items) if not clean_html(b.get("description","")).strip()]
+    briefs = dict(zip(missing, run_parallel([functools.partial(crawl_syn, clean_html(items[i].get("title","")), _isbn(items[i])) for i in missing],
+                                            timeout=20, default="")))
+    for i,b in enumerate(items):
+        img = b.get("image") or ""
+        title = clean_html(b.get("title",""))
+        desc = clean_html(b.get("description","")).strip()
+        if not desc:
+            desc = (briefs.get(i) or "").strip()[:180]
+        if len(desc)>180: desc = desc[:170]+"…"
+        c1,c2,c3 = st.columns([1,2,5])
+        with c1:
+            if img: st.image(img, use_container_width=True)
+        with c2:
+            st.markdown(f"**{title}**")
+            author = clean_html(b.get("author",""))
+            if author: st.caption(author)
+        with c3:
+            st.markdown(desc or "(소개 없음)")
+            if st.button("✅ 이 책 선택", key=f"reco_pick_{i}"):
+                select_book_and_build(b)
+                st.rerun()
+        st.markdown("<div style='height:8px;border-bottom:1px dashed #e5e7eb;'></div>", unsafe_allow_html=True)
+
+#  표지 대화 (조각: 답 하나에 이 부분만 다시 실행)
+@st.fragment
+def cover_chat(title:str, cover:str):
+    st.markdown("### 🖼️ 표지를 보며 내용 예측하기 (읽기 전 활동)")
+    if "chat" not in st.session_state:
+        cover_url=to_data_url(cover)
+        st.session_state.chat=[
+            {"role":"system","content":f"초등 대상 표지 대화 챗봇. 난이도:{st.session_state.level}. {level_params(st.session_state.level)['language']}로 질문해요."
+                                       +("" if cover_url else f" 표지 이미지를 불러오지 못했으니 책 제목 '{title}'으로 이야기해요.")}]
+        if cover_url:
+            st.session_state.chat.append({"role":"user","content":[{"type":"text","text":"표지입니다."},{"type":"image_url","image_url":{"url":cover_url,"detail":"low"}}]})
+        st.session_state.chat.append({"role":"assistant","content":"책 표지에서 가장 먼저 보이는 것은 무엇인가요?"})
+    for m in st.session_state.chat:
+        if m["role"]=="assistant": st.chat_message("assistant").write(m["content"])
+        elif m["role"]=="user" and isinstance(m["content"],str): st.chat_message("user").write(m["content"])
+    if n:=st.session_state.get("chat_tokens"): st.caption(f"지난 요청 프롬프트 ≈ {n} 토큰")
+    if u:=st.chat_input("답/질문 입력…"):
+        if contains_bad_language(u):
+            st.warning("바르고 고운말을 사용해 주세요. 아래처럼 바꿔 볼까요?"); st.info(rewrite_polite(u))
+        else:
+            st.session_state.chat.append({"role":"user","content":u})
+            rsp=gpt(fit_context(st.session_state.chat,"chat"),level_params(st.session_state.level)['temp'],400,kind="cover_chat")
+            st.session_state.chat.append({"role":"assistant","content":rsp}); rerun_fragment()
+
+#  PAGE 1 : 책검색 & 표지대화 
+def page_book():
+    st.markdown('<span class="badge">난이도(모든 활동 적용)</span>', unsafe_allow_html=True)
+    level = st.selectbox("난이도", ["쉬움","기본","심화"], index=["쉬움","기본","심화"].index(st.session_state.get("level","기본")))
+    st.session_state.level = level
+
+    intro_path=load_intro_path()
+    if intro_path:
+        l,c,r=st.columns([0.15,0.70,0.15]); 
+        with c: render_img_percent(intro_path,0.70)
+
+    st.header("📘 1) 책 찾기 & 표지 이야기")
+    if st.sidebar.button("활동 다시하기"): st.session_state.clear(); st.rerun()
+
+    #  이달의 추천 도서
+    rec_col, _ = st.columns([1,3])
+    with rec_col:
+        if st.button("🎁 이달의 추천 도서"):
+            st.session_state["show_reco"]= not st.session_state.get("show_reco", False)
+
+    if st.session_state.get("show_reco", False):
+        st.markdown("#### 이달의 추천 도서 (3~6학년 · 동화/소설)")
+        default_grade = min(max(int(st.session_state.get("grade",3)),3),6)
+        g = st.selectbox("학년 선택", options=[3,4,5,6], index=[3,4,5,6].index(default_grade))
+        c1,c2 = st.columns([1,4])
+        with c1:
+            if st.button("🔎 추천 불러오기"):
+                st.session_state["reco"] = fetch_grade_recs(int(g))
+        items = st.session_state.get("reco", [])
+        if items:
+            render_reco_table(items)
+        else:
+            st.info("추천 결과가 없어요. [🔎 추천 불러오기]를 눌러 주세요.")
+
+    #  일반 검색
+    q=st.text_input("책 제목·키워드")
+    if st.button("🔍 검색") and q.strip():
+        try: result=nv_search(q.strip())
+        except Exception as e: st.error(f"책 검색 오류: {e}"); result=[]
+        if not result: st.warning("검색 결과가 없거나(또는 안전 필터에 의해) 숨김 처리되었습니다.")
+        st.session_state.search=result
+
+    if bs:=st.session_state.get("search"):
+        _, sel=st.selectbox("책 선택",[(f"{clean_html(b['title'])} | {clean_html(b['author'])}",b) for b in bs],format_func=lambda x:x[0])
+        if st.button("✅ 선택"):
+            select_book_and_build(sel)
+
+    if bk:=st.session_state.get("selected_book"):
+        title=clean_html(bk["title"]); cover=bk["image"]; syn=st.session_state.synopsis
+        st.subheader("📖 줄거리"); st.write(syn or "(줄거리 없음)")
+        lc,rc=st.columns([1,1])
+        with lc: st.image(cover,caption=title,use_container_width=True)
+        with rc: cover_chat(title, cover)
+
+        if st.button("다음 단계 ▶ 2) 낱말 탐정"):
+            st.session_state.current_page="단어 알아보기"; st.rerun()
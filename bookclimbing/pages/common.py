@@ -0,0 +1,192 @@
+# 북클라이밍 · 화면 공통 (테마·이미지·조각 rerun·대화 맥락·저장·학생 패널)
+
+import streamlit as st, base64, mimetypes, datetime, os
+from ..config import GH_EVENTS_PATH, GH_STUDENTS_PATH
+from ..storage import db_insert_student, db_save_event, _norm_school
+from ..clients.llm import gpt
+from ..clients.github import gh_enqueue, gh_sync_queue
+
+# 테마 
+FONT_SIZES = {"작게":"14px","보통":"16px","크게":"18px"}
+
+def theme_css(font_px="16px"):
+    return f"""
+<style>
+html {{ color-scheme: light !important; }}
+:root{{
+  --bg:#ffffff; --sidebar-bg:#f6f7fb; --card:#ffffff; --text:#0b1220; --ring:#e5e7eb;
+  --btn-bg:#fef08a; --btn-text:#0b1220; --btn-bg-hover:#fde047;
+  --chip:#eef2ff; --chip-text:#1f2937;
+  --fs-base:{font_px};
+}}
+
+html, body {{
+  background: var(--bg) !important;
+  font-size: var(--fs-base);
+}}
+
+section.main > div.block-container{{
+  background: var(--card);
+  border-radius: 14px;
+  padding: 18px 22px;
+  box-shadow: 0 2px 16px rgba(0,0,0,.04);
+}}
+
+h1,h2,h3,h4,h5{{
+  color:var(--text)!important;
+  font-weight:800
+}}
+
+div[data-testid="stSidebar"]{{
+  background: var(--sidebar-bg)!important;
+  border-right:1px solid var(--ring)!important;
+}}
+
+.stButton>button, .stDownloadButton>button{{
+  background:var(--btn-bg)!important;
+  color:var(--btn-text)!important;
+  border-radius:12px!important;
+  padding:10px 16px!important;
+  font-weight:800!important;
+  box-shadow:0 6px 16px rgba(0,0,0,.08)!important;
+  transition:all .15s ease;
+}}
+
+.stButton>button:hover{{
+  background:var(--btn-bg-hover)!important;
+  transform:translateY(-1px)
+}}
+
+.badge{{
+  display:inline-block; padding:4px 10px; border-radius:999px;
+  background:var(--chip); color:var(--chip-text); font-size:0.85rem;
+}}
+
+.stTextInput>div>div>input,
+.stTextArea textarea {{
+  border: 4px solid var(--ring) !important;
+  border-radius: 8px !important;
+  padding: 8px 10px !important;
+}}
+</style>
+"""
+
+# 이미지
+def load_intro_path():
+    for name in ["asset/intro.png","asset/intro.jpg","asset/intro.jpeg","asset/intro.webp"]:
+        if os.path.exists(name): return name
+    return None
+def render_img_percent(path:str, percent:float=0.7):
+    with open(path,"rb") as f: b64=base64.b64encode(f.read()).decode()
+    mime=mimetypes.guess_type(path)[0] or "image/png"
+    st.markdown(f'<p style="text-align:center;"><img src="data:{mime};base64,{b64}" style="width:{int(percent*100)}%; border-radius:12px;"/></p>',unsafe_allow_html=True)
+
+#  조각(fragment) 다시 그리기: 대화·퀴즈·토론은 @st.fragment 안에서 돌아 답 하나에 그 부분만 다시 실행(사이드바·테마·표지는 그대로).
+#  조각 범위 rerun은 조각만 다시 실행될 때만 허용되므로, 앱 전체 실행 중(예: 토론 시작 직후)이면 전체 rerun으로
+def rerun_fragment():
+    try: st.rerun(scope="fragment")
+    except st.errors.StreamlitAPIException: st.rerun()
+
+#  대화 맥락 관리: 토큰 예산 안에서 최근 턴만 보내고, 넘친 옛 턴은 요약으로, 표지 이미지는 첫 대화 뒤엔 글로 대신
+CHAT_TOKEN_BUDGET = 2000
+CHAT_KEEP_MSGS    = 6     # 요약하지 않고 항상 원문으로 보내는 최근 메시지 수
+IMAGE_TOKENS      = 85    # detail=low 이미지 한 장의 고정 토큰
+
+def est_tokens(content)->int:
+    # 한글은 글자당 ~1토큰, 그 밖의 문자는 ~4글자당 1토큰으로 어림 (메시지 머리 4토큰)
+    if isinstance(content, list):
+        return sum(IMAGE_TOKENS if p.get("type")=="image_url" else est_tokens(p.get("text","")) for p in content)
+    text = content or ""
+    hangul = sum(1 for ch in text if "가" <= ch <= "힣")
+    return hangul + (len(text)-hangul)//4 + 4
+
+def _first_exchange_done(turns:list)->bool:
+    seen_user = False
+    for m in turns:
+        if m["role"]=="user" and isinstance(m["content"], str): seen_user = True
+        elif m["role"]=="assistant" and seen_user: return True
+    return False
+
+def _summarize_turns(prev:str, turns:list)->str:
+    lines = "\n".join(f"{'학생' if m['role']=='user' else '챗봇'}: {m['content']}" for m in turns if isinstance(m["content"], str))
+    return gpt([{"role":"user","content":"다음은 초등학생과 챗봇의 대화입니다. 이전 요약과 새 대화를 합쳐, 이어서 대화하는 데 필요한 "
+                 f"핵심(학생의 생각·근거, 챗봇의 질문)만 5문장 이내로 요약해줘.\n\n이전 요약:\n{prev or '(없음)'}\n\n새 대화:\n{lines}"}],
+               0.2, 300, kind="chat_summary")
+
+def fit_context(history:list, state_key:str, budget:int=CHAT_TOKEN_BUDGET, keep:int=CHAT_KEEP_MSGS)->list:
+    """history=[system, 턴...] 전체 기록은 그대로 두고, 이번 요청에 보낼 messages만 만든다.
+    예산을 넘으면 앞쪽 턴을 예산의 절반까지 요약으로 넘기고(요약은 session_state에 누적), 토큰 추정치를 기록."""
+    system, turns = history[0], history[1:]
+    if _first_exchange_done(turns):
+        turns = [{"role":m["role"], "content":"(책 표지 이미지는 앞에서 함께 봤어요.)"} if isinstance(m["content"], list) else m for m in turns]
+    done, summary = st.session_state.get(f"{state_key}_summary", (0, ""))
+    recent = turns[done:]
+    fixed = est_tokens(system["content"]) + est_tokens(summary)
+    if fixed + sum(est_tokens(m["content"]) for m in recent) > budget:
+        cut = 0
+        while len(recent)-cut > keep and fixed + sum(est_tokens(m["content"]) for m in recent[cut:]) > budget//2: cut += 1
+        if cut:
+            summary = _summarize_turns(summary, recent[:cut]); done += cut; recent = recent[cut:]
+            st.session_state[f"{state_key}_summary"] = (done, summary)
+    msgs = [system] + ([{"role":"system","content":"지금까지 대화 요약:\n"+summary}] if summary else []) + recent
+    st.session_state[f"{state_key}_tokens"] = sum(est_tokens(m["content"]) for m in msgs)
+    return msgs
+
+#  저장 (현재 세션의 학생 기준)
+def save_student(year:int, school:str, grade:int, klass:int, number:int, name:str):
+    school = _norm_school(school)
+    student_id = f"{int(year)}-{school}-{int(grade)}-{int(klass)}-{int(number)}"
+    db_insert_student(student_id, year, school, grade, klass, number, name or "")
+    gh_enqueue(GH_STUDENTS_PATH, {"type":"student", "student_id":student_id, "year":year, "school":school,
+                                  "grade":grade, "klass":klass, "number":number, "name":name or "",
+                                  "ts":datetime.datetime.now().isoformat()})
+    st.session_state.update(dict(student_id=student_id, year=year, school=school,
+                                 grade=grade, klass=klass, number=number, name=name))
+    st.toast(f"학생 저장 완료: {student_id}" + (f" ({name})" if name else ""), icon="✅")
+
+def save_event(page:str, payload:dict):
+    year  = int(st.session_state.get("year", datetime.datetime.now().year))
+    school= _norm_school(st.session_state.get("school",""))
+    grade = int(st.session_state.get("grade",0))
+    klass = int(st.session_state.get("klass",0))
+    number= int(st.session_state.get("number",0))
+    sid = st.session_state.get("student_id") or f"{year}-{school}-{grade}-{klass}-{number}"
+    st.session_state.student_id = sid  # 고정
+
+    ts = datetime.datetime.now().isoformat()
+    db_save_event(sid, page, payload, ts, student=(year, school, grade, klass, number, st.session_state.get("name","")))
+    gh_enqueue(GH_EVENTS_PATH, {"type":"event", "student_id":sid, "ts":ts, "page":page, "payload":payload})
+    st.toast(f"기록 저장: {page}", icon="💾")
+
+#  학생 패널 
+def student_panel():
+    if "ui_font_size_choice" not in st.session_state:
+        st.session_state["ui_font_size_choice"] = "보통"
+
+    st.markdown("#### 🅰️ 글씨 크기")
+    st.radio("글씨 크기 선택", ["작게","보통","크게"],
+             key="ui_font_size_choice", horizontal=True, label_visibility="collapsed")
+    st.divider()
+
+    st.markdown("#### 👤 학생 정보")
+    with st.form("student_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            year  = st.number_input("학년도", min_value=2020, max_value=2100, value=int(st.session_state.get("year", datetime.datetime.now().year)), step=1)
+            school= st.text_input("학교", value=_norm_school(st.session_state.get("school","")))
+            grade = st.number_input("학년", min_value=1, max_value=6, value=int(st.session_state.get("grade",3)), step=1)
+        with col2:
+            klass = st.number_input("반", min_value=1, max_value=20, value=int(st.session_state.get("klass",1)), step=1)
+            number= st.number_input("번호", min_value=1, max_value=50, value=int(st.session_state.get("number",1)), step=1)
+            name  = st.text_input("이름(선택)", value=st.session_state.get("name",""))
+        submitted = st.form_submit_button("학생 사용/저장")
+        if submitted:
+            save_student(int(year), _norm_school(school), int(grade), int(klass), int(number), name)
+
+    # GitHub 상태 배지(선택)
+    if q:=gh_sync_queue():
+        m = q.metrics()
+        last = f" · 최근 커밋 {m['last_flush_s']}초" if m["last_flush_s"] is not None else ""
+        st.markdown(f"<span class='badge'>GitHub 동기화: 활성 · 대기 {m['depth']}건{last}</span>", unsafe_allow_html=True)
+        if m["last_error"]: st.caption(f"동기화 오류: {m['last_error']}" + (f" · {m['retry_in_s']:.0f}초 뒤 다시 시도" if m["retry_in_s"] else ""))
+        if m["parked"]: st.caption(f"GitHub가 거절해 따로 둔 기록 {m['parked']}건 (이 컴퓨터의 DB에는 남아 있음)")
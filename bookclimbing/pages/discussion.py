@@ -0,0 +1,153 @@
+import streamlit as st, json, functools, uuid
+from ..util import clean_html, run_parallel, strip_fence, _io_pool
+from ..clients.llm import gpt
+from ..safety import contains_bad_language, rewrite_polite
+from ..books import build_debate_txt_bytes, catalog_get, level_params, recommend_topics
+from .common import fit_context, rerun_fragment, save_event
+
+#  PAGE 4 : 독서 토론 
+DEBATE_LABELS={1:"찬성측 입론",2:"반대측 입론",3:"찬성측 반론",4:"반대측 반론",5:"찬성측 최후 변론",6:"반대측 최후 변론"}
+
+def _is_user_step(step:int)->bool:
+    return (step%2==1 and st.session_state.user_side=="찬성") or (step%2==0 and st.session_state.user_side=="반대")
+
+def start_bot_turn():
+    # 지금 라운드가 챗봇 차례면 발언 생성을 백그라운드에 미리 걸어 둠 → 다음 rerun이 결과를 집어 감
+    rd=st.session_state.debate_round; order=st.session_state.debate_order
+    if rd>len(order) or _is_user_step(order[rd-1]): return
+    if (p:=st.session_state.get("debate_pending")) and p[0]==rd: return
+    convo=fit_context(st.session_state.debate_chat+[{"role":"user","content":f"[{DEBATE_LABELS[order[rd-1]]}]"}],"debate_chat")
+    st.session_state.debate_pending=(rd, _io_pool().submit(gpt, convo, level_params(st.session_state.level)['temp'], 420, "debate_turn"))
+
+#  토론 진행·평가 (조각: 발언 하나, 챗봇 차례 하나마다 이 부분만 다시 실행)
+@st.fragment
+def debate_board(title:str):
+    lbl=DEBATE_LABELS
+    for m in st.session_state.debate_chat:
+        if m["role"]=="assistant": st.chat_message("assistant").write(str(m["content"]))
+        elif m["role"]=="user": st.chat_message("user").write(str(m["content"]))
+    if n:=st.session_state.get("debate_chat_tokens"): st.caption(f"지난 요청 프롬프트 ≈ {n} 토큰")
+    rd=st.session_state.debate_round; order=st.session_state.debate_order
+    if rd<=len(order):
+        step=order[rd-1]
+        st.markdown(f"### 현재: {lbl[step]}")
+        if _is_user_step(step):
+            txt = st.chat_input("내 발언")
+            if txt:
+                if contains_bad_language(txt):
+                    st.warning("바르고 고운말을 사용해 주세요. 아래처럼 바꿔 볼까요?"); st.info(rewrite_polite(txt))
+                else:
+                    st.session_state.debate_chat.append({"role":"user","content":f"[{lbl[step]}] {txt}"})
+                    st.session_state.debate_round+=1; start_bot_turn(); rerun_fragment()
+        else:
+            start_bot_turn()
+            _, fut = st.session_state.debate_pending
+            bot, err = None, None
+            with st.chat_message("assistant"):
+                with st.spinner(f"{lbl[step]}을 준비하고 있어요…"):
+                    try: bot=fut.result(timeout=120)
+                    except Exception as e: err=e
+            st.session_state.pop("debate_pending",None)
+            if bot is None:
+                st.error(f"챗봇 발언을 만들지 못했어요: {err}")
+                if st.button("🔁 다시 시도"): rerun_fragment()
+            else:
+                st.session_state.debate_chat.append({"role":"assistant","content":bot})
+                st.session_state.debate_round+=1; rerun_fragment()
+    else:
+        if "debate_eval" not in st.session_state:
+            transcript=[]
+            for m in st.session_state.debate_chat:
+                if m["role"]=="user": transcript.append(f"STUDENT({st.session_state.user_side}): {m['content']}")
+                elif m["role"]=="assistant": transcript.append(f"BOT({st.session_state.bot_side}): {m['content']}")
+            score_prompt=("아래는 초등학생과 챗봇의 찬반 토론 대화입니다.\n각 측에 대해 5가지 기준을 0~20점으로 채점, 총점 100점.\n"
+                          "기준: 1줄거리 이해 2생각을 분명히 말함(책과 연결) 3근거 제시 4질문에 답하고 잇기 5새로운 질문/깊이.\n"
+                          f"학생(STUDENT)은 '{st.session_state.user_side}', BOT은 '{st.session_state.bot_side}'. JSON만:\n"
+                          "{{\"pro\":{{\"criteria_scores\":[..5..],\"total\":정수}},\"con\":{{\"criteria_scores\":[..5..],\"total\":정수}},\"winner\":\"찬성|반대\"}}")
+            my_lines=[m["content"] for m in st.session_state.debate_chat if m["role"]=="user" and "[" in m["content"]]
+            other_lines=[m["content"] for m in st.session_state.debate_chat if m["role"]=="assistant"]
+            fb_prompt=(f"너는 초등 토론 코치야. 아래 '학생 발언'만 근거로 서술형 피드백을 써줘. 챗봇 발언은 참고만.\n"
+                       "구성: ① 총평 ② 잘한 점 ③ 더 나아질 점 ④ 다음 토론 팁(행동문장). 쉬운 말 사용.\n\n"
+                       f"[학생 측:{st.session_state.user_side}] 발언:\n" + "\n".join(my_lines[:50]) +
+                       "\n\n(참고) 상대 발언:\n" + "\n".join(other_lines[:50]) +
+                       "\n\n토론의 근거가 된 줄거리:\n" + st.session_state.synopsis[:1200])
+            # 채점과 피드백은 서로 독립 → 동시에 (평가 시간 = 둘 중 느린 쪽)
+            with st.status("토론 평가 중… 채점과 피드백을 함께 만들고 있어요", expanded=False) as status:
+                res_score, fb = run_parallel([
+                    functools.partial(gpt, [{"role":"user","content":"\n".join(transcript)+"\n\n"+score_prompt}], 0.2, 800, "debate_score"),
+                    functools.partial(gpt, [{"role":"user","content":fb_prompt}], 0.3, 1200, "debate_feedback")], timeout=150)
+                status.update(label="토론 평가 완료", state="complete")
+            try: st.session_state.score_json=json.loads(strip_fence(res_score))
+            except: st.session_state.score_json={"pro":{"total":0},"con":{"total":0},"winner":"-"}
+            st.session_state.user_feedback_text=fb or "(피드백을 만들지 못했어요. 토론 초기화 후 다시 시도해 보세요.)"
+            sc=st.session_state.score_json
+            save_event("debate",{
+                "title": title, "topic": st.session_state.debate_topic,
+                "pro_total": sc.get("pro",{}).get("total",0),
+                "con_total": sc.get("con",{}).get("total",0),
+                "winner": sc.get("winner","-"),
+                "transcript": transcript,
+                "feedback": st.session_state.user_feedback_text
+            })
+            st.session_state.debate_eval=True; rerun_fragment()
+        else:
+            st.subheader("토론 평가")
+            score=st.session_state.get("score_json",{})
+            if score:
+                st.write(f"**점수 요약** · 찬성: **{score.get('pro',{}).get('total','-')}점**, 반대: **{score.get('con',{}).get('total','-')}점**  → **승리: {score.get('winner','-')}**")
+            st.markdown("**내 발언 기준 피드백**"); st.write(st.session_state.get("user_feedback_text",""))
+            transcript=[]
+            for m in st.session_state.debate_chat:
+                if m["role"]=="user": transcript.append(f"학생({st.session_state.user_side}): {m['content']}")
+                elif m["role"]=="assistant": transcript.append(f"챗봇({st.session_state.bot_side}): {m['content']}")
+            data, mime, fname = build_debate_txt_bytes(title, st.session_state.debate_topic, st.session_state.user_side, transcript, score, st.session_state.get("user_feedback_text",""))
+            st.download_button("🧾 토론 기록 TXT 저장", data=data, file_name=fname, mime=mime, key="debate_txt_dl")
+
+def page_discussion():
+    st.header("🗣️ 4) 독서 생각 나누기")
+    if "selected_book" not in st.session_state:
+        st.info("책을 먼저 선택해주세요.");
+        if st.button("◀ 이전 (1)"): st.session_state.current_page="책 검색"; st.rerun()
+        return
+    if st.sidebar.button("토론 초기화"):
+        for k in ("debate_started","debate_round","debate_chat","debate_topic","debate_eval","user_side","bot_side","topics","topic_choice","score_json","user_feedback_text","debate_chat_summary","debate_chat_tokens","debate_pending"): st.session_state.pop(k,None)
+        st.rerun()
+
+    title=clean_html(st.session_state.selected_book["title"]); syn=st.session_state.synopsis
+    st.markdown(f"**책 제목:** {title}  &nbsp;&nbsp; <span class='badge'>난이도: {st.session_state.level}</span>", unsafe_allow_html=True)
+    lv=st.session_state.level; lvp=level_params(lv)
+
+    if st.button("🎯 토론 주제 추천 2가지"):
+        hist = st.session_state.get("topic_history", {})
+        avoid = list(hist.get(title, []))
+        cat = catalog_get(st.session_state.selected_book, lv)
+        if cat and len(cat["topics"])>=2 and not set(cat["topics"])<=set(avoid): topics = cat["topics"][:2]
+        else: topics = recommend_topics(title, syn, lv, avoid, nonce=uuid.uuid4().hex[:8] if avoid else None)   # 다시 추천이면 새로
+        st.session_state.topics = topics
+        hist.setdefault(title, set()).update(topics)
+        st.session_state.topic_history = hist
+
+    if tp:=st.session_state.get("topics"):
+        st.subheader("추천 주제 선택")
+        choice=st.radio("토론 주제", tp+["(직접 입력)"], index=0, key="topic_choice")
+    else:
+        choice=st.radio("토론 주제", ["(직접 입력)"], index=0, key="topic_choice")
+    topic=st.text_input("직접 입력", value=st.session_state.get("debate_topic","")) if choice=="(직접 입력)" else choice
+    side=st.radio("당신은?",("찬성","반대"))
+    b1,b2=st.columns([1,1])
+    with b1: start_clicked=st.button("🚀 토론 시작")
+    with b2:
+        if st.button("다음 단계 ▶ 5) 독서 생각 성찰하기"): st.session_state.current_page="독서 감상문 피드백"; st.rerun()
+
+    if start_clicked:
+        if not topic or not topic.strip(): st.warning("토론 주제를 입력하거나 선택해주세요.")
+        else:
+            rounds=lvp['debate_rounds']; order={4:[1,2,3,4],6:[1,2,3,4,5,6]}[rounds]
+            for k in ("debate_chat_summary","debate_chat_tokens","debate_eval","debate_pending"): st.session_state.pop(k,None)
+            st.session_state.update({
+                "debate_started":True,"debate_round":1,"debate_topic":topic,
+                "user_side":side,"bot_side":"반대" if side=="찬성" else "찬성","debate_order":order,
+                "debate_chat":[{"role":"system","content":f"초등 독서토론 진행자. 모든 발언은 반드시 책의 줄거리 근거. 난이도:{lv}, 어조:{lvp['language']}. 주제 '{topic}'. 1찬성입론 2반대입론 3찬성반론 4반대반론"+("" if len(order)==4 else " 5찬성최후 6반대최후")+f". 근거는 다음 줄거리에서만:\n{syn[:1200]}"}]
+            }); start_bot_turn(); st.rerun()
+
+    if st.session_state.get("debate_started"): debate_board(title)
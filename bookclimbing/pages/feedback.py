@@ -0,0 +1,34 @@
+import streamlit as st
+from ..util import clean_html
+from ..clients.llm import gpt_stream
+from ..clients.ocr import ocr_pages
+from ..books import level_params
+from .common import save_event
+
+# PAGE 5 : 감상문 피드백 
+def page_feedback():
+    st.header("✍️ 5) 독서 생각 성찰하기")
+    if st.sidebar.button("피드백 초기화"): st.session_state.pop("essay",""); st.session_state.pop("ocr_file",""); st.rerun()
+    if st.session_state.get("selected_book"):
+        title=clean_html(st.session_state.selected_book["title"]); syn=st.session_state.synopsis
+        st.markdown(f"**책:** {title}  &nbsp;&nbsp; <span class='badge'>난이도: {st.session_state.level}</span>", unsafe_allow_html=True)
+    else: title="제목 없음"; syn=""
+
+    ups=st.file_uploader("손글씨 사진 업로드 (여러 장이면 순서대로 선택)",type=["png","jpg","jpeg"],accept_multiple_files=True)
+    sig="|".join(f"{u.name}:{u.size}" for u in ups or [])
+    if ups and st.session_state.get("ocr_file")!=sig:
+        bar=st.progress(0.0, text=f"글자 읽는 중… 0/{len(ups)}장")
+        st.session_state.essay=ocr_pages([u.getvalue() for u in ups], lambda n,total: bar.progress(n/total, text=f"글자 읽는 중… {n}/{total}장"))
+        st.session_state.ocr_file=sig; st.rerun()
+
+    essay=st.text_area("감상문 입력 또는 OCR 결과", value=st.session_state.get("essay",""), key="essay", height=240)
+    if st.button("🧭 피드백 받기"):
+        if not essay.strip(): st.error("감상문을 입력하거나 업로드하세요"); return
+        depth="간단히" if st.session_state.level=="쉬움" else ("충분히 자세히" if st.session_state.level=="기본" else "구체적 근거와 함께")
+        fb_prompt=("너는 초등 글쓰기 코치야. 학생 감상문을 **선택한 책의 줄거리**와 비교하여 칭찬과 수정 제안을 해줘. 점수/일치도 말하지 마.\n"
+                   "출력: 1) 내용 피드백 2) 표현·구성 피드백 3) 수정 예시("+depth+")\n\n"
+                   "다음 항목을 고려해줘 1) 인상 깊은 부분이 잘나타났는가 2) 자신의 생각이나 느낌이 잘드러났는가 3) 줄거리가 잘 드러났는가 4) 맞춤법과 문법이 정확한가\n"
+                   f"선택 책: {title}\n줄거리:\n{syn}\n\n학생 감상문:\n{essay}")
+        st.subheader("피드백 결과")
+        fb=st.write_stream(gpt_stream([{"role":"user","content":fb_prompt}],level_params(st.session_state.level)['temp'],2300,kind="essay_feedback")).strip()
+        save_event("essay", {"title": title, "essay": essay, "feedback": fb, "level": st.session_state.level})
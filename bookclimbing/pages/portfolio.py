@@ -0,0 +1,78 @@
+import streamlit as st, datetime
+import pandas as pd   # 이 화면을 처음 열 때 임포트됨 (main이 화면 모듈을 그때 불러옴)
+from ..storage import db_dashboard_metrics, db_event_payload, db_event_titles, db_quiz_series, db_recent_events, _norm_school
+
+#  PAGE 6 : 포트폴리오 & 대시보드 
+def page_portfolio_dashboard():
+    st.header("🎒 6) 나의 독서 앨범")
+    st.caption("먼저 학년도/학교/학년/반/번호를 고르면, 그 아래에 기록을 정리해 보여줍니다. 번호가 0이면 학급 전체 집계입니다.")
+    col1,col2,col3,col4,col5 = st.columns(5)
+    year  = col1.number_input("학년도", min_value=2020, max_value=2100, value=int(st.session_state.get("year", datetime.datetime.now().year)), step=1)
+    school= col2.text_input("학교", value=_norm_school(st.session_state.get("school","")))
+    grade = col3.number_input("학년(0=전체)", min_value=0, max_value=6, value=int(st.session_state.get("grade",0)), step=1)
+    klass = col4.number_input("반(0=전체)", min_value=0, max_value=20, value=int(st.session_state.get("klass",0)), step=1)
+    number= col5.number_input("번호(0=전체)", min_value=0, max_value=50, value=0, step=1)
+
+    # 현재 검색 키로 만들어지는 학생ID를 안내 (디버그·확인용)
+    if year and school and grade and klass and number:
+        st.caption(f"검색 학생ID: **{int(year)}-{_norm_school(school)}-{int(grade)}-{int(klass)}-{int(number)}**")
+
+    flt = dict(year=int(year), school=_norm_school(school), grade=int(grade), klass=int(klass), number=int(number))
+    m = db_dashboard_metrics(**flt)
+    if not m["total"]:
+        st.info("조건에 맞는 기록이 없습니다."); return
+
+    colm = st.columns(5)
+    colm[0].metric("총 활동 건수", m["total"])
+    colm[1].metric("평균 퀴즈 점수", round(m["avg_quiz"],1) if m["avg_quiz"] is not None else 0.0)
+    colm[2].metric("평균(찬성) 토론점수", round(m["avg_pro"],1) if m["avg_pro"] is not None else 0.0)
+    colm[3].metric("평균(반대) 토론점수", round(m["avg_con"],1) if m["avg_con"] is not None else 0.0)
+    colm[4].metric("가장 많이 선택한 책", m["top_books"][0][0] if m["top_books"] else "-")
+    if number==0:
+        st.subheader("📈 학급 활동 요약 (전체)")
+        st.bar_chart(pd.DataFrame(m["page_counts"], columns=["활동","건수"]).set_index("활동"))
+        if m["score_dist"]:
+            st.markdown("**퀴즈 점수 분포**"); st.bar_chart(pd.DataFrame(m["score_dist"], columns=["점수","건수"]).set_index("점수"))
+        if m["monthly_reads"]:
+            st.markdown("**월별 독서 수**"); st.bar_chart(pd.DataFrame(m["monthly_reads"], columns=["month","reads"]).set_index("month"))
+        else:
+            st.info("아직 책 선택(독서) 기록이 없어 '월별 독서 수' 그래프를 표시할 수 없습니다.")
+        if m["top_books"]:
+            top5=pd.DataFrame(m["top_books"], columns=["책","건수"]).set_index("책")
+            st.markdown("**가장 많이 선택한 책 Top5**"); st.bar_chart(top5)
+        st.subheader("📜 최근 활동 로그 (일부)")
+        st.dataframe(pd.DataFrame(db_recent_events(50, **flt), columns=["ts","student_id","page"]), use_container_width=True)
+        return
+    st.subheader("🙋 선택 학생 포트폴리오")
+    sid=f"{int(year)}-{_norm_school(school)}-{int(grade)}-{int(klass)}-{int(number)}"
+    st.caption(f"학생 ID: {sid}")
+    qrows=db_quiz_series(**flt)
+    if qrows:
+        qdf=pd.DataFrame([(ts, score) for ts,_,score in qrows], columns=["ts","score"]).set_index("ts")
+        st.markdown("**퀴즈 점수 변화**"); st.line_chart(qdf)
+    debates=db_event_titles("debate", **flt)
+    if debates:
+        last=db_event_payload(debates[-1][0])
+        colx, coly = st.columns([1,1])
+        colx.metric("최근 토론(찬성) 점수", last.get("pro_total","-"))
+        coly.metric("최근 토론(반대) 점수", last.get("con_total","-"))
+        st.markdown("**최근 토론 주제**: " + str(last.get("topic","-")))
+        st.markdown("**토론 로그**"); st.text("\n".join(last.get("transcript",[])))
+        st.markdown("**토론 피드백**"); st.write(last.get("feedback",""))
+    essays=db_event_titles("essay", **flt)
+    if essays:
+        st.subheader("✍️ 독서감상문 피드백")
+        opts=[f'{ts[:16].replace("T"," ")} · {title or "-"}' for _,ts,title in essays]
+        pick = st.selectbox("감상문 선택", options=range(len(opts)), format_func=lambda k: opts[k], index=len(opts)-1)
+        chosen = db_event_payload(essays[pick][0])
+        e_title = chosen.get("title", "-")
+        e_text  = chosen.get("essay", "").strip()
+        e_fb    = chosen.get("feedback", "").strip()
+        st.markdown(f"**책 제목:** {e_title}")
+        with st.expander("📝 학생 감상문(원문) 보기", expanded=False):
+            st.text(e_text or "(입력된 감상문이 없습니다.)")
+        st.markdown("**피드백**"); st.write(e_fb or "(피드백 내용이 없습니다.)")
+        if e_text or e_fb:
+            txt = f"독서감상문 기록\n\n[책] {e_title}\n\n[학생 감상문]\n{e_text}\n\n[피드백]\n{e_fb}\n"
+            st.download_button("📥 감상문+피드백 TXT 저장", data=txt.encode("utf-8"),
+                               file_name="essay_feedback.txt", mime="text/plain", key="essay_txt_dl")
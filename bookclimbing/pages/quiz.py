@@ -0,0 +1,66 @@
+import streamlit as st, json, random, uuid
+from ..util import clean_html
+from ..clients.llm import gpt_stream
+from ..books import QUIZ_ITEMS, catalog_get, generate_quiz, level_params, reshuffle_quiz
+from .common import rerun_fragment, save_event
+
+#  문항·채점 (조각: 보기를 고르거나 채점해도 이 부분만 다시 실행)
+@st.fragment
+def quiz_form(title:str):
+    q=st.session_state.quiz; uid=st.session_state.ans_uid
+    lv=st.session_state.level; lvp=level_params(lv)
+    if "answers" not in st.session_state: st.session_state.answers={}
+    for i,qa in enumerate(q):
+        st.markdown(f"**문제 {i+1}.** {qa['question']}")
+        pick=st.radio("",qa["options"],index=None,key=f"ans-{uid}-{i}")
+        if pick is not None:
+            st.session_state.answers[i]=qa["options"].index(pick)+1
+    c1,c2=st.columns([1,1])
+    with c1:
+        if st.button("📊 채점"):
+            miss=[i+1 for i in range(QUIZ_ITEMS) if i not in st.session_state.answers]
+            if miss: st.error(f"{miss}번 문제 선택 안함"); return
+            correct=[st.session_state.answers[i]==q[i]["correct_answer"] for i in range(QUIZ_ITEMS)]
+            score=sum(correct)*100//QUIZ_ITEMS
+            st.subheader("결과")
+            for i,ok in enumerate(correct,1):
+                st.write(f"문제 {i}: {'⭕' if ok else '❌'} (정답: {q[i-1]['options'][q[i-1]['correct_answer']-1]})")
+            st.write(f"**총점: {score} / 100**")
+            guide="아주 쉽게" if lv=="쉬움" else ("근거 인용과 함께" if lv=="심화" else "핵심 이유 중심")
+            st.write_stream(gpt_stream([{"role":"user","content":"다음 JSON으로 각 문항 해설과 총평을 한국어로 작성. 난이도:"+lv+" "+guide+".\n"+json.dumps({"quiz":q,"student_answers":st.session_state.answers},ensure_ascii=False)}],lvp['temp'],lvp['explain_len'],kind="explain"))
+            save_event("quiz", {"title": title, "score": score, "correct": correct, "level": st.session_state.level})
+    with c2:
+        if st.button("🔁 다시 도전하기"):
+            st.session_state.answers={}
+            st.session_state.ans_uid = uid + 1
+            rerun_fragment()
+
+#  PAGE 3 : 퀴즈 
+def page_quiz():
+    st.header("📝 3) 이야기 퀴즈")
+    if "selected_book" not in st.session_state:
+        st.info("책을 먼저 선택해주세요.");
+        if st.button("◀ 이전 (1)"): st.session_state.current_page="책 검색"; st.rerun()
+        return
+    if st.sidebar.button("퀴즈 초기화"):
+        st.session_state.pop("quiz",None); st.session_state.pop("answers",None)
+        st.session_state.quiz_nonce=uuid.uuid4().hex[:8]   # 다음 '퀴즈 생성'은 캐시된 같은 퀴즈 대신 새로
+        st.rerun()
+    title=clean_html(st.session_state.selected_book["title"]); syn=st.session_state.synopsis
+    st.markdown(f"**책 제목:** {title}  &nbsp;&nbsp; <span class='badge'>난이도: {st.session_state.level}</span>", unsafe_allow_html=True)
+    lv=st.session_state.level
+
+    if "ans_uid" not in st.session_state: st.session_state.ans_uid = 0
+
+    if "quiz" not in st.session_state and st.button("🧠 퀴즈 생성"):
+        cat=catalog_get(st.session_state.selected_book, lv)
+        if cat and cat["quizzes"]: st.session_state.quiz=reshuffle_quiz(random.choice(cat["quizzes"]))
+        else:
+            with st.spinner("퀴즈를 만들고 있어요…"): q=generate_quiz(title,syn,lv,nonce=st.session_state.get("quiz_nonce"))
+            if q: st.session_state.quiz=q
+            else: st.error("퀴즈를 만들지 못했어요. 다시 눌러 주세요.")
+
+    if st.session_state.get("quiz"): quiz_form(title)
+
+    if st.button("다음 단계 ▶ 4) 독서 생각 나누기"):
+        st.session_state.current_page="독서 토론"; st.rerun()
@@ -0,0 +1,54 @@
+import streamlit as st
+from ..util import clean_html, run_parallel
+from ..clients.llm import gpt
+from ..safety import contains_bad_language, rewrite_polite
+from ..books import related_words
+
+#  PAGE 2 : 단어 알아보기 
+def page_vocab():
+    st.header("🧩 2) 낱말 탐정")
+    if "selected_book" not in st.session_state:
+        st.info("책을 먼저 선택해주세요."); 
+        if st.button("◀ 이전 (1)"): st.session_state.current_page="책 검색"; st.rerun()
+        return
+    title=clean_html(st.session_state.selected_book["title"])
+    st.markdown(f"**책 제목:** {title}  &nbsp;&nbsp; <span class='badge'>난이도: {st.session_state.level}</span>", unsafe_allow_html=True)
+
+    word = st.text_input("궁금한 단어", value=st.session_state.get("word",""))
+    if st.button("🧠 단어 알아보기"):
+        if not word.strip(): st.warning("단어를 입력하세요.")
+        elif contains_bad_language(word):
+            st.warning("바르고 고운말을 사용해 주세요 😊"); st.info(rewrite_polite(word))
+        else:
+            lv=st.session_state.level
+            req=(f"초등학생 {lv} 수준으로 '{word}'를 설명해줘. "
+                 f"1) 쉬운 뜻 1줄  2) 사용 예시 2가지(각 1문장). 어려운 한자어는 쉬운 말로.")
+            meaning, rel = run_parallel([lambda: gpt([{"role":"user","content":req}],0.3,380,kind="vocab"),
+                                         lambda: related_words(word, lv)], timeout=60)
+            if meaning is None: st.error("뜻 설명을 만들지 못했어요. 다시 눌러 주세요.")
+            st.session_state.vocab_meaning = meaning
+            st.session_state.rel_out = rel or {"meaning":"(설명 생성 실패)","synonyms":[],"antonyms":[],"examples":[]}
+            st.session_state.word = word
+
+    if st.session_state.get("vocab_meaning"):
+        st.markdown("#### 뜻과 예시")
+        st.write(st.session_state.vocab_meaning); st.divider()
+
+    if st.session_state.get("rel_out"):
+        rel=st.session_state.rel_out
+        st.markdown("#### 관련있는 낱말", unsafe_allow_html=True)
+        cL, cR = st.columns(2)
+        with cL:
+            st.markdown("**비슷한 말(동의어)**")
+            st.write(", ".join(rel.get("synonyms",[])) or "(없음)")
+        with cR:
+            st.markdown("**반대되는 말(반의어)**")
+            st.write(", ".join(rel.get("antonyms",[])) or "(없음)")
+        st.markdown("**쉬운 설명**")
+        st.write(rel.get("meaning",""))
+        if rel.get("examples"):
+            st.markdown("**예문**")
+            for ex in rel["examples"]: st.write("- " + ex)
+
+    if st.button("다음 단계 ▶ 3) 이야기 퀴즈"):
+        st.session_state.current_page="독서 퀴즈"; st.rerun()
@@ -0,0 +1,117 @@
+# 북클라이밍 · 안전 필터
+
+import streamlit as st, re, collections, unicodedata
+from .util import book_key, clean_html
+from .clients.llm import gpt
+
+ADULT_PATTERNS = [r"\b19\s*금\b","청소년\s*이용\s*불가","성인","야설","에로","포르노","노출","선정적","음란","야한","Adult","Erotic","Porn","R-?rated","BL\s*성인","성(관계|행위|묘사)","무삭제\s*판","금서\s*해제"]
+BAD_WORDS = ["씨발","시발","병신","ㅄ","ㅂㅅ","좆","개새끼","새끼","좆같","ㅈ같","니애미","느금","개같","꺼져","죽어","염병","씹","sex","porn"]
+# 자주 나오는 말은 템플릿으로 바로 고침("" = 지움). 템플릿이 없는 단어가 섞이면 LLM 으로 넘김
+POLITE_TEMPLATES = {"씨발":"", "시발":"", "좆":"", "염병":"", "씹":"", "니애미":"", "느금":"",
+    "병신":"친구", "ㅄ":"친구", "ㅂㅅ":"친구", "개새끼":"친구", "새끼":"친구",
+    "좆같":"속상하", "ㅈ같":"속상하", "개같":"속상하", "꺼져":"저리 가 줄래", "죽어":"그만해 줘"}
+# 템플릿은 낱말 머리에서 시작하고 낱말 끝(또는 이 조사·어미 앞)에서 끝나는 경우에만 씀 — '새끼손가락', '죽어가는' 같은
+# 멀쩡한 낱말 속 토막은 고치지 않고 LLM에 맡김
+TEMPLATE_TAILS = {"", "야", "아", "들", "은", "는", "이", "가", "을", "를", "도", "만", "한테", "네", "다", "요"}
+_JAMO_EQUIV = {"ㅄ":"ㅂㅅ"}
+def _is_hangul(c): o=ord(c); return 0xAC00<=o<=0xD7A3 or 0x3131<=o<=0x318E
+def normalize_for_match(text:str):
+    """검사용 정규화 -> (norm, idx). idx[i] 는 norm[i] 가 가리키는 NFC 원문 위치.
+    NFKC·소문자, 낱말 안의 기호/숫자/폭 없는 문자 제거, 한 글자짜리 토막끼리는 띄어쓰기를 붙임('시 발' O, '시 발표' X)"""
+    text=unicodedata.normalize("NFC", text or "")
+    toks, cur = [], []
+    for i,c in enumerate(text):
+        if c.isspace():
+            if cur: toks.append(cur); cur=[]
+            continue
+        if not _is_hangul(c):
+            if unicodedata.category(c)[0] in "PSNCZ": continue
+            c=unicodedata.normalize("NFKC", c).lower()
+        for ch in _JAMO_EQUIV.get(c, c): cur.append((ch, i))
+    if cur: toks.append(cur)
+    norm, idx = [], []
+    for k,t in enumerate(toks):
+        if k and not (len(t)==1 and len(toks[k-1])==1): norm.append(" "); idx.append(t[0][1])
+        for ch,i in t: norm.append(ch); idx.append(i)
+    return "".join(norm), idx
+
+class AhoCorasick:
+    """여러 단어를 한 번에 찾는 트라이 자동자. find 는 (시작, 끝, 단어) 를 돌려줌"""
+    def __init__(self, words):
+        self.go, self.fail, self.out = [{}], [0], [[]]
+        for w in words:
+            s=0
+            for c in w:
+                if c not in self.go[s]:
+                    self.go.append({}); self.fail.append(0); self.out.append([]); self.go[s][c]=len(self.go)-1
+                s=self.go[s][c]
+            self.out[s].append(w)
+        q=collections.deque(self.go[0].values())
+        while q:
+            s=q.popleft()
+            for c,n in self.go[s].items():
+                f=self.fail[s]
+                while f and c not in self.go[f]: f=self.fail[f]
+                self.fail[n]=self.go[f].get(c,0) if self.go[f].get(c,0)!=n else 0
+                self.out[n]=self.out[n]+self.out[self.fail[n]]; q.append(n)
+    def _step(self, s, c):
+        while s and c not in self.go[s]: s=self.fail[s]
+        return self.go[s].get(c,0)
+    def search(self, text)->bool:
+        s=0
+        for c in text:
+            s=self._step(s,c)
+            if self.out[s]: return True
+        return False
+    def find(self, text):
+        s, hits = 0, []
+        for j,c in enumerate(text):
+            s=self._step(s,c)
+            for w in self.out[s]: hits.append((j-len(w)+1, j+1, w))
+        return hits
+
+@st.cache_resource
+def bad_matcher():
+    words={normalize_for_match(w)[0] for w in BAD_WORDS}
+    m=AhoCorasick(w for w in words if w)
+    m.templates={normalize_for_match(k)[0]:v for k,v in POLITE_TEMPLATES.items()}
+    return m
+@st.cache_resource
+def adult_re(): return re.compile("|".join(ADULT_PATTERNS), re.I)
+@st.cache_resource
+def _book_verdicts(): return collections.OrderedDict()
+BOOK_VERDICT_MAX = 20000
+def is_adult_book(item:dict)->bool:
+    if "adult" in item:
+        try:
+            if bool(item["adult"]): return True
+        except: pass
+    key=book_key(item); cache=_book_verdicts()
+    if key in cache: return cache[key]
+    text=clean_html(" ".join(str(item.get(k) or "") for k in ("title","author","description","publisher")))
+    v=bool(adult_re().search(text))
+    cache[key]=v
+    while len(cache)>BOOK_VERDICT_MAX: cache.popitem(last=False)
+    return v
+def contains_bad_language(text:str)->bool: return bad_matcher().search(normalize_for_match(text)[0])
+def polite_template(text:str):
+    """템플릿만으로 고칠 수 있으면 고친 문장, 아니면 None"""
+    text=unicodedata.normalize("NFC", text or ""); norm, idx = normalize_for_match(text)
+    hits, end = [], -1
+    m=bad_matcher()
+    for s,e,w in sorted(m.find(norm), key=lambda h:(h[0],-(h[1]-h[0]))):   # 왼쪽·긴 것 우선, 겹침 제거
+        if s<end: continue
+        rep=m.templates.get(w)
+        tok_end=norm.find(" ", e); tok_end=len(norm) if tok_end<0 else tok_end
+        if rep is None or (s and norm[s-1]!=" ") or norm[e:tok_end] not in TEMPLATE_TAILS: return None
+        hits.append((idx[s], idx[e-1]+1, rep)); end=e
+    out=text
+    for s,e,rep in reversed(hits): out=out[:s]+rep+out[e:]
+    out=re.sub(r"\s{2,}"," ",out).strip(" ,.!?~")
+    if len(out)<2 or contains_bad_language(out): return None
+    return out
+def rewrite_polite(text:str)->str:
+    fixed=polite_template(text)
+    if fixed: return fixed
+    try: return gpt([{"role":"user","content":f"다음 문장을 초등학생에게 어울리는 바르고 고운말로 바꿔줘. 의미는 유지하고 공격적 표현은 모두 제거:\n{text}"}],0.2,120,kind="rewrite_polite")
+    except: return "바르고 고운말을 사용해 다시 표현해 보세요."
@@ -0,0 +1,693 @@
+# 북클라이밍 · 데이터 (SQLite)
+
+import streamlit as st, json, time, datetime, os, sqlite3, threading, queue, contextlib, hashlib, collections, functools, glob, zlib
+from .config import GH_EVENTS_PATH, GH_STUDENTS_PATH
+
+DB_PATH = "classdb.db"
+DB_POOL_SIZE = 8
+
+# payload에서 꺼내 두는 JSON 생성 컬럼 (행마다 json.loads 안 함)
+EVENT_JSON_COLUMNS = (("title","TEXT"), ("score","INTEGER"), ("pro_total","INTEGER"), ("con_total","INTEGER"), ("level","TEXT"))
+def _json_col(col:str, typ:str)->str:
+    return f"{col} {typ} GENERATED ALWAYS AS (CASE WHEN json_valid(payload) THEN json_extract(payload, '$.{col}') END) VIRTUAL"
+
+# 스키마 마이그레이션: PRAGMA user_version 기준으로 아직 적용 안 된 단계만 한 번 실행
+SCHEMA_MIGRATIONS = [
+    # v1: 기본 테이블
+    ("""CREATE TABLE IF NOT EXISTS students(
+        student_id TEXT PRIMARY KEY,
+        year INT, school TEXT, grade INT, klass INT, number INT,
+        created_at TEXT, name TEXT
+    )""",
+     """CREATE TABLE IF NOT EXISTS events(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id TEXT, ts TEXT, page TEXT, payload TEXT
+    )""",
+     """CREATE TABLE IF NOT EXISTS gh_outbox(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT, line TEXT, queued_at REAL
+    )"""),
+    # v2: 대시보드 조회용 인덱스 + 자주 쓰는 payload 필드를 JSON 생성 컬럼으로 (행마다 json.loads 안 함)
+    ("CREATE INDEX IF NOT EXISTS idx_events_student_ts ON events(student_id, ts)",
+     "CREATE INDEX IF NOT EXISTS idx_events_page_ts ON events(page, ts)",
+     "CREATE INDEX IF NOT EXISTS idx_students_class ON students(year, school, grade, klass, number)",
+     *[f"ALTER TABLE events ADD COLUMN {_json_col(col, typ)}" for col, typ in EVENT_JSON_COLUMNS]),
+    # v3: (학생, 월, 활동)별 집계 테이블 — db_save_event가 같은 트랜잭션에서 갱신
+    ("""CREATE TABLE IF NOT EXISTS rollup_activity(
+        year INT, school TEXT, grade INT, klass INT, number INT, student_id TEXT, month TEXT, page TEXT,
+        n INT NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0, score_n INT NOT NULL DEFAULT 0,
+        pro_sum REAL NOT NULL DEFAULT 0, pro_n INT NOT NULL DEFAULT 0,
+        con_sum REAL NOT NULL DEFAULT 0, con_n INT NOT NULL DEFAULT 0,
+        PRIMARY KEY(student_id, month, page)
+    )""",
+     """CREATE TABLE IF NOT EXISTS rollup_counters(
+        year INT, school TEXT, grade INT, klass INT, number INT, student_id TEXT, month TEXT,
+        kind TEXT, key TEXT, n INT NOT NULL DEFAULT 0, first_ts TEXT,
+        PRIMARY KEY(student_id, month, kind, key)
+    )""",
+     "CREATE INDEX IF NOT EXISTS idx_rollup_activity_class ON rollup_activity(year, school, grade, klass, number)",
+     "CREATE INDEX IF NOT EXISTS idx_rollup_counters_class ON rollup_counters(kind, year, school, grade, klass, number)",
+     "@rollup_backfill"),
+    # v4: LLM 응답 디스크 캐시
+    ("""CREATE TABLE IF NOT EXISTS llm_cache(
+        key TEXT PRIMARY KEY, kind TEXT, value TEXT, expires REAL
+    )""",),
+    # v5: 도서 사전 생성 카탈로그 (책 × 난이도)
+    ("""CREATE TABLE IF NOT EXISTS book_catalog(
+        book_key TEXT, level TEXT, title TEXT, synopsis TEXT, quizzes TEXT, topics TEXT, updated_at TEXT,
+        PRIMARY KEY(book_key, level)
+    )""",),
+    # v6: LLM 호출 계측
+    ("""CREATE TABLE IF NOT EXISTS llm_metrics(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts REAL, day TEXT, kind TEXT, model TEXT,
+        prompt_tokens INT, completion_tokens INT, ms REAL, ttft_ms REAL,
+        ok INT, error TEXT, cached INT
+    )""",
+     "CREATE INDEX IF NOT EXISTS idx_llm_metrics_day ON llm_metrics(day, kind)"),
+    # v7: 책 소개 크롤링 캐시 (intro='' 는 못 찾음 → 짧은 TTL)
+    ("""CREATE TABLE IF NOT EXISTS syn_cache(
+        key TEXT PRIMARY KEY, title TEXT, intro TEXT, source TEXT, expires REAL
+    )""",),
+    # v8: OCR 결과 캐시 (원본 이미지 sha256)
+    ("CREATE TABLE IF NOT EXISTS ocr_cache(hash TEXT PRIMARY KEY, text TEXT, ts REAL)",),
+    # v9: JSONL 가져오기/내보내기 — (student_id, ts, page) 중복 제거 후 유일 인덱스, 파일별 진행 위치
+    ("DELETE FROM events WHERE id NOT IN (SELECT MIN(id) FROM events GROUP BY student_id, ts, page)",
+     "CREATE UNIQUE INDEX IF NOT EXISTS idx_events_natural ON events(student_id, ts, page)",
+     "DROP INDEX IF EXISTS idx_events_student_ts",
+     """CREATE TABLE IF NOT EXISTS sync_checkpoints(
+        name TEXT PRIMARY KEY, pos INTEGER NOT NULL DEFAULT 0, head TEXT, updated_at REAL
+    )""",
+     "@rollup_backfill"),
+    # v10: 범위(학년도|학교|학년|반|번호 앞부분)별 데이터 버전 — 대시보드 캐시 무효화용
+    ("CREATE TABLE IF NOT EXISTS data_version(scope TEXT PRIMARY KEY, v INTEGER NOT NULL DEFAULT 0)",),
+    # v11: 큰 payload 필드를 압축 blob으로 분리 (기존 행도 옮김)
+    ("""CREATE TABLE IF NOT EXISTS blobs(
+        hash TEXT PRIMARY KEY, codec TEXT NOT NULL, data BLOB NOT NULL, size INT
+    )""",
+     "@blob_backfill"),
+    # v12: 정수 키 — schools(id, name), students.id + (학년도, 학교, 학년, 반, 번호) 유일 인덱스, events.student_key.
+    #      events는 id를 그대로 두고 새 표로 옮기며, 집계 테이블도 정수 키로 다시 만듦. 내보내기는 처음부터 다시 씀
+    ("@students_from_events",
+     "CREATE TABLE schools(id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+     "INSERT OR IGNORE INTO schools(name) SELECT TRIM(COALESCE(school,'')) FROM students ORDER BY created_at",
+     """CREATE TABLE students_v12(
+        id INTEGER PRIMARY KEY, student_id TEXT NOT NULL UNIQUE,
+        year INT, school_id INT NOT NULL REFERENCES schools(id), grade INT, klass INT, number INT,
+        name TEXT, created_at TEXT
+    )""",
+     "CREATE UNIQUE INDEX idx_students_natural ON students_v12(year, school_id, grade, klass, number)",
+     """INSERT OR IGNORE INTO students_v12(student_id, year, school_id, grade, klass, number, name, created_at)
+        SELECT s.student_id, s.year, sc.id, s.grade, s.klass, s.number, s.name, s.created_at
+        FROM students s JOIN schools sc ON sc.name=TRIM(COALESCE(s.school,'')) ORDER BY s.created_at""",
+     f"""CREATE TABLE events_v12(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_key INTEGER NOT NULL REFERENCES students(id), ts TEXT, page TEXT, payload TEXT,
+        {", ".join(_json_col(col, typ) for col, typ in EVENT_JSON_COLUMNS)}
+    )""",
+     # 학생은 같은 student_id로 먼저, 없으면(같은 학급 정보의 다른 표기가 먼저 들어간 경우) 학급 정보로 찾음
+     """INSERT INTO events_v12(id, student_key, ts, page, payload)
+        SELECT MIN(e.id), n.id, e.ts, e.page, e.payload FROM events e
+        JOIN students o ON o.student_id=e.student_id
+        JOIN students_v12 n ON n.id=COALESCE(
+            (SELECT id FROM students_v12 WHERE student_id=o.student_id),
+            (SELECT v.id FROM students_v12 v JOIN schools sc ON sc.id=v.school_id
+             WHERE v.year=o.year AND sc.name=TRIM(COALESCE(o.school,'')) AND v.grade=o.grade AND v.klass=o.klass AND v.number=o.number))
+        GROUP BY n.id, e.ts, e.page ORDER BY MIN(e.id)""",
+     "DROP TABLE events",
+     "ALTER TABLE events_v12 RENAME TO events",
+     "CREATE UNIQUE INDEX idx_events_natural ON events(student_key, ts, page)",
+     "CREATE INDEX idx_events_page_ts ON events(page, ts)",
+     "DROP TABLE students",
+     "ALTER TABLE students_v12 RENAME TO students",
+     "DROP TABLE rollup_activity",
+     "DROP TABLE rollup_counters",
+     """CREATE TABLE rollup_activity(
+        year INT, school_id INT, grade INT, klass INT, number INT, student_key INT, month TEXT, page TEXT,
+        n INT NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0, score_n INT NOT NULL DEFAULT 0,
+        pro_sum REAL NOT NULL DEFAULT 0, pro_n INT NOT NULL DEFAULT 0,
+        con_sum REAL NOT NULL DEFAULT 0, con_n INT NOT NULL DEFAULT 0,
+        PRIMARY KEY(student_key, month, page)
+    )""",
+     """CREATE TABLE rollup_counters(
+        year INT, school_id INT, grade INT, klass INT, number INT, student_key INT, month TEXT,
+        kind TEXT, key TEXT, n INT NOT NULL DEFAULT 0, first_ts TEXT,
+        PRIMARY KEY(student_key, month, kind, key)
+    )""",
+     "CREATE INDEX idx_rollup_activity_class ON rollup_activity(year, school_id, grade, klass, number)",
+     "CREATE INDEX idx_rollup_counters_class ON rollup_counters(kind, year, school_id, grade, klass, number)",
+     "DELETE FROM sync_checkpoints WHERE name LIKE 'export:%'",
+     "@rollup_backfill"),
+    # v13: GitHub가 내용을 거절한 기록을 outbox 앞에서 치워 두는 곳 (기록 자체는 events에 그대로 있음)
+    ("""CREATE TABLE IF NOT EXISTS gh_deadletter(
+        id INTEGER PRIMARY KEY, path TEXT, line TEXT, queued_at REAL, failed_at REAL, error TEXT
+    )""",),
+]
+
+SQL_INSERT_EVENT   = "INSERT INTO events(student_key, ts, page, payload) VALUES (?,?,?,?)"
+SQL_ENSURE_STUDENT = """INSERT INTO students(student_id, year, school_id, grade, klass, number, name, created_at)
+                        VALUES (?,?,?,?,?,?,?,?) ON CONFLICT DO NOTHING"""   # student_id·학급 정보 어느 쪽이 겹쳐도 그대로 둠
+
+# 집계 테이블 갱신: where="e.id=?"면 방금 넣은 한 건, "e.id>?"면 가져오기 한 묶음, "1=1"이면 전체 재구성
+# (NOT INDEXED: GROUP BY 순서 때문에 (student_key, …) 인덱스 전체를 훑지 않고 id 범위로만 읽게)
+ROLLUP_ACTIVITY_SQL = """INSERT INTO rollup_activity(year, school_id, grade, klass, number, student_key, month, page,
+                                                     n, score_sum, score_n, pro_sum, pro_n, con_sum, con_n)
+    SELECT s.year, s.school_id, s.grade, s.klass, s.number, e.student_key, substr(e.ts,1,7) AS month, e.page,
+           COUNT(*), TOTAL(e.score), COUNT(e.score), TOTAL(e.pro_total), COUNT(e.pro_total), TOTAL(e.con_total), COUNT(e.con_total)
+    FROM events e NOT INDEXED JOIN students s ON s.id=e.student_key
+    WHERE {where} GROUP BY e.student_key, month, e.page
+    ON CONFLICT(student_key, month, page) DO UPDATE SET
+        n=n+excluded.n, score_sum=score_sum+excluded.score_sum, score_n=score_n+excluded.score_n,
+        pro_sum=pro_sum+excluded.pro_sum, pro_n=pro_n+excluded.pro_n,
+        con_sum=con_sum+excluded.con_sum, con_n=con_n+excluded.con_n"""
+ROLLUP_COUNTERS_SQL = """INSERT INTO rollup_counters(year, school_id, grade, klass, number, student_key, month, kind, key, n, first_ts)
+    SELECT * FROM (
+        SELECT s.year, s.school_id, s.grade, s.klass, s.number, e.student_key, substr(e.ts,1,7) AS month,
+               'book', e.title, COUNT(*), MIN(e.ts)
+        FROM events e NOT INDEXED JOIN students s ON s.id=e.student_key
+        WHERE {where} AND e.page='book' AND e.title IS NOT NULL GROUP BY e.student_key, month, e.title
+        UNION ALL
+        SELECT s.year, s.school_id, s.grade, s.klass, s.number, e.student_key, substr(e.ts,1,7) AS month,
+               'quiz_score', CAST(e.score AS TEXT), COUNT(*), MIN(e.ts)
+        FROM events e NOT INDEXED JOIN students s ON s.id=e.student_key
+        WHERE {where} AND e.page='quiz' AND e.score IS NOT NULL GROUP BY e.student_key, month, e.score
+    ) WHERE true
+    ON CONFLICT(student_key, month, kind, key) DO UPDATE SET n=n+excluded.n, first_ts=MIN(first_ts, excluded.first_ts)"""
+
+def _rollup_add(conn, event_id:int):
+    conn.execute(ROLLUP_ACTIVITY_SQL.format(where="e.id=?"), (event_id,))
+    conn.execute(ROLLUP_COUNTERS_SQL.format(where="e.id=?"), (event_id, event_id))
+
+def _rollup_backfill(conn):
+    conn.execute("DELETE FROM rollup_activity"); conn.execute("DELETE FROM rollup_counters")
+    conn.execute(ROLLUP_ACTIVITY_SQL.format(where="1=1"))
+    conn.execute(ROLLUP_COUNTERS_SQL.format(where="1=1"))
+
+#  큰 payload 필드(토론 기록·감상문·피드백)는 압축해 blobs 테이블에 내용 해시로 한 번만 두고, payload에는 {"$blob": sha256}만.
+#  대시보드 훑기는 작은 메타데이터만 읽고, 본문은 포트폴리오·TXT 저장·내보내기에서만 풀어 씀
+BLOB_FIELDS = ("transcript", "essay", "feedback")
+BLOB_MIN_BYTES = 200
+try: import zstandard as _zstd
+except ImportError: _zstd = None
+
+def _compress(raw:bytes):
+    if _zstd: return "zstd", _zstd.ZstdCompressor(level=10).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+def _decompress(codec:str, data:bytes)->bytes:
+    if codec == "zstd": return _zstd.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+def pack_payload(conn, payload:dict)->str:
+    """payload → events.payload 문자열. BLOB_FIELDS 중 큰 값은 blobs로 옮기고 참조만 남김 (쓰기 트랜잭션 안에서)"""
+    out = dict(payload)
+    for k in BLOB_FIELDS:
+        v = out.get(k)
+        if v is None or (isinstance(v, dict) and "$blob" in v): continue
+        raw = json.dumps(v, ensure_ascii=False).encode("utf-8")
+        if len(raw) < BLOB_MIN_BYTES: continue
+        h = hashlib.sha256(raw).hexdigest()
+        if not conn.execute("SELECT 1 FROM blobs WHERE hash=?", (h,)).fetchone():
+            conn.execute("INSERT INTO blobs(hash, codec, data, size) VALUES (?,?,?,?)", (h, *_compress(raw), len(raw)))
+        out[k] = {"$blob": h}
+    return json.dumps(out, ensure_ascii=False)
+
+def hydrate_payload(conn, payload:dict)->dict:
+    # {"$blob": …} 참조를 원래 값으로. 없는 blob은 참조 그대로 둠
+    refs = {k: v["$blob"] for k, v in payload.items() if isinstance(v, dict) and "$blob" in v}
+    if not refs: return payload
+    rows = {h: (c, d) for h, c, d in conn.execute(
+        f"SELECT hash, codec, data FROM blobs WHERE hash IN ({','.join('?'*len(refs))})", list(refs.values()))}
+    out = dict(payload)
+    for k, h in refs.items():
+        if h in rows: out[k] = json.loads(_decompress(*rows[h]))
+    return out
+
+def _blob_backfill(conn, batch:int=1000):
+    last = 0
+    while rows := conn.execute("SELECT id, payload FROM events WHERE id>? ORDER BY id LIMIT ?", (last, batch)).fetchall():
+        for eid, raw in rows:
+            if len(raw or "") < BLOB_MIN_BYTES: continue
+            try: d = json.loads(raw)
+            except ValueError: continue
+            if isinstance(d, dict) and (new := pack_payload(conn, d)) != raw:
+                conn.execute("UPDATE events SET payload=? WHERE id=?", (new, eid))
+        last = rows[-1][0]
+
+def _students_from_events(conn):
+    # v12 준비(옛 문자열 키 스키마): 학생 행 없이 남은 기록의 학생을 student_id에서 복원해 정수 키로 옮길 때 빠지지 않게.
+    # 형식이 깨진 student_id는 자리표시 학생으로(_sid_meta) — 그 기록도 그대로 옮겨지고 내보내짐
+    now = datetime.datetime.now().isoformat()
+    for (sid,) in conn.execute("""SELECT DISTINCT e.student_id FROM events e
+                                  LEFT JOIN students s ON s.student_id=e.student_id WHERE s.student_id IS NULL""").fetchall():
+        conn.execute("INSERT INTO students(student_id, year, school, grade, klass, number, name, created_at) VALUES (?,?,?,?,?,?,?,?)",
+                     (sid, *_sid_meta(sid), "", now))
+
+# 마이그레이션 단계 안에서 "@이름"은 SQL 대신 같은 트랜잭션에서 실행할 파이썬 함수.
+# MIGRATION_DEFERRED에 든 것은 그 자리 대신 모든 단계를 적용한 뒤 한 번만(최신 스키마 기준) 실행
+MIGRATION_HOOKS = {"@rollup_backfill": _rollup_backfill, "@blob_backfill": _blob_backfill,
+                   "@students_from_events": _students_from_events}
+MIGRATION_DEFERRED = ("@rollup_backfill",)
+
+def _migrate(conn):
+    conn.execute("BEGIN IMMEDIATE")   # 다른 프로세스가 동시에 올려도 한쪽만 적용
+    try:
+        ver = conn.execute("PRAGMA user_version").fetchone()[0]; deferred = []
+        for v, stmts in enumerate(SCHEMA_MIGRATIONS[ver:], ver+1):
+            for sql in stmts:
+                if sql in MIGRATION_DEFERRED:
+                    if sql not in deferred: deferred.append(sql)
+                elif sql in MIGRATION_HOOKS: MIGRATION_HOOKS[sql](conn)
+                else: conn.execute(sql)
+            conn.execute(f"PRAGMA user_version={v}")
+        for hook in deferred: MIGRATION_HOOKS[hook](conn)
+    except BaseException:
+        conn.execute("ROLLBACK"); raise
+    conn.execute("COMMIT")
+
+class _Database:
+    """프로세스 공용 SQLite 접근 계층.
+    Streamlit은 rerun마다 새 스레드를 쓰므로 스레드별 연결 대신 작은 연결 풀을 돌려 쓴다.
+    연결마다 컴파일된 문장이 캐시되고(cached_statements), 쓰기는 프로세스 안에서는 락으로,
+    프로세스 사이에서는 BEGIN IMMEDIATE + busy_timeout으로 줄 세워 "database is locked"를 피한다."""
+    def __init__(self, path:str, pool_size:int=DB_POOL_SIZE):
+        self.path, self.pool_size = path, pool_size
+        self.pool = queue.LifoQueue(); self.write_lock = threading.Lock()
+        with self.read() as conn: _migrate(conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=15, isolation_level=None,
+                               check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=15000")
+        return conn
+
+    @contextlib.contextmanager
+    def read(self):
+        try: conn = self.pool.get_nowait()
+        except queue.Empty: conn = self._connect()
+        try: yield conn
+        finally:
+            if self.pool.qsize() < self.pool_size: self.pool.put(conn)
+            else: conn.close()
+
+    @contextlib.contextmanager
+    def tx(self):
+        with self.write_lock, self.read() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try: yield conn
+            except BaseException:
+                conn.execute("ROLLBACK"); raise
+            conn.execute("COMMIT")
+
+@st.cache_resource
+def _db():
+    return _Database(DB_PATH)
+
+#  정수 키 해석: 학교 이름 → schools.id, student_id 문자열 → (students.id, (학년도, 학교, 학년, 반, 번호)).
+#  한 번 정해진 키는 바뀌지 않으므로 프로세스 캐시에 두고 크기만 제한. 쓰기 트랜잭션 안에서 만든 키는 커밋 뒤에 넣음
+ID_CACHE_SIZE = 50000
+
+class IdCache:
+    def __init__(self, size:int=ID_CACHE_SIZE):
+        self.size = size; self.schools = {}; self.students = {}
+        self.stats = collections.Counter()   # hit, miss
+
+    def put(self, student_id:str, hit:tuple):
+        if len(self.students) >= self.size: self.students.clear()
+        self.students[student_id] = hit
+
+@st.cache_resource
+def id_cache():
+    return IdCache()
+
+def school_id(name:str):
+    # 조회 전용. 없는 학교면 None
+    name = _norm_school(name); cache = id_cache()
+    if name in cache.schools: return cache.schools[name]
+    with _db().read() as conn:
+        row = conn.execute("SELECT id FROM schools WHERE name=?", (name,)).fetchone()
+    if row: cache.schools[name] = row[0]
+    return row[0] if row else None
+
+def _student_row(conn, student_id:str):
+    row = conn.execute("""SELECT s.id, s.year, sc.name, s.grade, s.klass, s.number
+                          FROM students s JOIN schools sc ON sc.id=s.school_id WHERE s.student_id=?""", (student_id,)).fetchone()
+    return (row[0], tuple(row[1:])) if row else None
+
+def student_key(student_id:str):
+    """조회 전용: student_id → (students.id, 학급 정보) 또는 None"""
+    cache = id_cache()
+    if (hit := cache.students.get(student_id)) is not None:
+        cache.stats["hit"] += 1; return hit
+    cache.stats["miss"] += 1
+    with _db().read() as conn: hit = _student_row(conn, student_id)
+    if hit: cache.put(student_id, hit)
+    return hit
+
+def _resolve_student(conn, student_id:str, meta=None, name:str=""):
+    """쓰기 트랜잭션 안에서 student_id → (students.id, 학급 정보). 없으면 meta(없으면 student_id를 나눠서)로 학교·학생 행을 만듦"""
+    if hit := _student_row(conn, student_id): return hit
+    year, school, grade, klass, number = tuple(meta) if meta else _sid_meta(student_id)
+    meta = (year, school := _norm_school(school), grade, klass, number)   # "한국초 "가 따로 학교·학생으로 생기지 않게
+    conn.execute("INSERT OR IGNORE INTO schools(name) VALUES (?)", (school,))
+    sc = conn.execute("SELECT id FROM schools WHERE name=?", (school,)).fetchone()[0]
+    conn.execute(SQL_ENSURE_STUDENT, (student_id, year, sc, grade, klass, number, name, datetime.datetime.now().isoformat()))
+    # 방금 만든 행이면 student_id로, 같은 학급 정보의 학생이 이미 있으면 그 행으로 (자리표시 학생은 학급 정보가 비어 student_id로만 찾힘)
+    key = (conn.execute("SELECT id FROM students WHERE student_id=?", (student_id,)).fetchone()
+           or conn.execute("SELECT id FROM students WHERE year=? AND school_id=? AND grade=? AND klass=? AND number=?",
+                           (year, sc, grade, klass, number)).fetchone())[0]
+    return key, meta
+
+# 데이터 버전: 기록이 들어오면 그 학생을 포함하는 모든 범위("", "2025", "2025|한국초", … 번호까지)의 버전을 올림
+SQL_BUMP_VERSION = "INSERT INTO data_version(scope, v) VALUES (?,1) ON CONFLICT(scope) DO UPDATE SET v=v+1"
+
+def _version_scopes(year, school, grade, klass, number)->list:
+    if year is None: return [""]   # 학급 정보가 없는 자리표시 학생(_sid_meta) → 전체 범위만
+    vals = [str(int(year)), school, str(int(grade)), str(int(klass)), str(int(number))]
+    return ["|".join(vals[:i]) for i in range(len(vals)+1)]
+
+def _bump_version(conn, meta:tuple):
+    # meta=(year, school, grade, klass, number)
+    conn.executemany(SQL_BUMP_VERSION, [(s,) for s in _version_scopes(*meta)])
+
+def _bump_all_versions(conn):
+    # 가져오기·집계 재구성처럼 범위를 가리기 어려운 대량 변경 → 모든 범위에 걸리는 "*" 버전을 올림
+    conn.execute(SQL_BUMP_VERSION, ("*",))
+
+def db_insert_student(student_id, year, school, grade, klass, number, name):
+    try:
+        with _db().tx() as conn:
+            hit = _resolve_student(conn, student_id, (year, school, grade, klass, number), name)
+            conn.execute("UPDATE students SET name=? WHERE id=?", (name, hit[0]))
+            _bump_version(conn, hit[1])
+        id_cache().put(student_id, hit)
+    except Exception as e:
+        st.warning(f"학생 저장 오류: {e}")
+
+def db_save_event(student_id, page, payload_dict, ts=None, student=None):
+    # student=(year, school, grade, klass, number, name)이면 처음 보는 학생의 행 만들기까지 한 트랜잭션(한 번의 fsync)으로
+    try:
+        hit = id_cache().students.get(student_id)
+        with _db().tx() as conn:
+            key, meta = hit or _resolve_student(conn, student_id, student[:5] if student else None, student[5] if student else "")
+            cur = conn.execute(SQL_INSERT_EVENT,
+                               (key, ts or datetime.datetime.now().isoformat(), page, pack_payload(conn, payload_dict)))
+            _rollup_add(conn, cur.lastrowid)
+            _bump_version(conn, meta)
+        if not hit: id_cache().put(student_id, (key, meta))
+    except Exception as e:
+        st.warning(f"기록 저장 오류: {e}")
+
+def rebuild_rollups():
+    """기존 events로 집계 테이블을 처음부터 다시 채움 (python app.py rebuild-rollups)."""
+    with _db().tx() as conn: _rollup_backfill(conn); _bump_all_versions(conn)
+
+#  JSONL ↔ SQLite: data/*.jsonl(+ GitHub 동기화 조각 data/events/*.jsonl)을 줄 단위로 흘려 읽어 묶음마다 한 트랜잭션.
+#  파일별 바이트 위치를 sync_checkpoints에 같은 트랜잭션으로 남겨, 중간에 끊겨도 이어서 읽음
+IMPORT_BATCH = 20000
+# 이미 있는 student_id는 이름·생성 시각만 고치고(학급 정보가 달라도 처음 것을 유지), 새 student_id만 넣음 — 같은 학급 정보면 그 학생에 합침.
+# 실제로 바뀌는 행만 건드려 total_changes가 '새로 들어오거나 바뀐 학생 수'가 되게 함(같은 파일을 다시 읽으면 0)
+# (ON CONFLICT를 두 개 겹쳐 쓰는 건 SQLite 3.35부터라 두 문장으로: 어느 유일 제약에 걸려도 20000줄 묶음이 통째로 실패하지 않게)
+SQL_IMPORT_STUDENT_UPDATE = """UPDATE students SET name=CASE WHEN :name<>'' THEN :name ELSE name END, created_at=MIN(created_at, :ts)
+    WHERE student_id=:sid AND ((:name<>'' AND name<>:name) OR created_at>:ts)"""
+SQL_IMPORT_STUDENT = """INSERT INTO students(student_id, year, school_id, grade, klass, number, name, created_at)
+    SELECT :sid, :year, id, :grade, :klass, :number, :name, :ts FROM schools
+    WHERE name=:school AND NOT EXISTS (SELECT 1 FROM students WHERE student_id=:sid)
+    ON CONFLICT(year, school_id, grade, klass, number) DO UPDATE SET
+        name=CASE WHEN excluded.name<>'' THEN excluded.name ELSE name END, created_at=MIN(created_at, excluded.created_at)
+        WHERE (excluded.name<>'' AND name<>excluded.name) OR created_at>excluded.created_at"""
+
+def _jsonl_files(path:str)->list:
+    # 원본 파일 + 같은 이름 폴더 아래 조각들(파일 이름이 시각 순)
+    base, ext = os.path.splitext(path)
+    return ([path] if os.path.exists(path) else []) + sorted(glob.glob(f"{base}/*{ext or '.jsonl'}"))
+
+def _file_head(f, n:int)->str:
+    # 이미 읽은 앞부분(최대 4KB)의 지문: 뒤에 덧붙기만 했으면 그대로, 파일을 다시 썼으면 달라짐
+    n = min(n, 4096); f.seek(0)
+    return f"{n}:{hashlib.sha1(f.read(n)).hexdigest()}"
+
+def _jsonl_batches(f, start:int, batch:int):
+    """start 바이트부터 (레코드 목록, 다음 위치, 깨진 줄 수)를 batch건씩. 마지막 줄이 아직 쓰는 중(JSON 미완성)이면 그 앞에서 멈춤"""
+    f.seek(start); rows, bad, pos, done = [], 0, start, start
+    for line in iter(f.readline, b""):
+        try: rec = json.loads(line) if line.strip() else None
+        except ValueError:
+            if not line.endswith(b"\n"): break
+            rec = None; bad += 1
+        pos += len(line)
+        if isinstance(rec, dict): rows.append(rec)
+        if len(rows) >= batch: yield rows, pos, bad; rows, bad, done = [], 0, pos
+    if pos > done: yield rows, pos, bad
+
+def _sid_parts(sid:str):
+    # "2025-한국초-3-1-1" → (2025, "한국초", 3, 1, 1). 학교 이름에 '-'가 있어도 양끝에서 자르고, 앞뒤 공백은 화면 입력처럼 정리
+    y, rest = sid.split("-", 1); sc, gr, kl, no = rest.rsplit("-", 3)
+    return int(y), _norm_school(sc), int(gr), int(kl), int(no)
+
+def _sid_meta(sid:str):
+    # 나눌 수 없는 student_id(옛 기록·손으로 고친 파일)는 학급 정보 없이 학교 ''인 자리표시 학생으로 — 기록을 버리지 않음
+    try: return _sid_parts(sid)
+    except (ValueError, AttributeError): return (None, "", None, None, None)
+
+def _import_students(conn, rows:list)->int:
+    params = []
+    for r in rows:
+        if r.get("type", "student") != "student" or not r.get("student_id"): continue
+        params.append(dict(sid=r["student_id"], year=r.get("year"), grade=r.get("grade"), klass=r.get("klass"), number=r.get("number"),
+                           name=r.get("name") or "", ts=r.get("ts") or datetime.datetime.now().isoformat(), school=_norm_school(r.get("school"))))
+    conn.executemany("INSERT OR IGNORE INTO schools(name) VALUES (?)", {(p["school"],) for p in params})
+    before = conn.total_changes
+    conn.executemany(SQL_IMPORT_STUDENT_UPDATE, params)
+    conn.executemany(SQL_IMPORT_STUDENT, params)
+    return conn.total_changes - before
+
+def _import_events(conn, rows:list, rollup:bool=True)->int:
+    # 임시 테이블에 한꺼번에 넣고 INSERT OR IGNORE(유일 인덱스로 중복 제거) → 새로 들어간 id만 집계에 더함.
+    # rollup=False(빈 DB 복원)면 집계는 끝에 한 번에 — 그 전에 끊기면 'rollup:stale' 표시가 남아 다음 가져오기가 마저 함
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_events(student_id TEXT, ts TEXT, page TEXT, payload TEXT)")
+    conn.execute("DELETE FROM temp.import_events")
+    conn.executemany("INSERT INTO temp.import_events VALUES (?,?,?,?)",
+                     [(r["student_id"], r["ts"], r["page"], pack_payload(conn, r.get("payload") or {}))
+                      for r in rows if r.get("type", "event") == "event" and r.get("student_id") and r.get("ts") and r.get("page")])
+    # 학생 파일에 없는 student_id는 학급 정보를 복원해 학생 행을 만들고, 정수 키는 임시 표로 (같은 학생의 다른 표기도 여기서 맞춤)
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_keys(student_id TEXT PRIMARY KEY, student_key INT)")
+    conn.execute("DELETE FROM temp.import_keys")
+    keys = []
+    for (sid,) in conn.execute("""SELECT DISTINCT i.student_id FROM temp.import_events i
+                                  LEFT JOIN students s ON s.student_id=i.student_id WHERE s.id IS NULL""").fetchall():
+        keys.append((sid, _resolve_student(conn, sid)[0]))
+    conn.executemany("INSERT INTO temp.import_keys VALUES (?,?)", keys)
+    last = conn.execute("SELECT COALESCE(MAX(id),0) FROM events").fetchone()[0]
+    n = conn.execute("""INSERT OR IGNORE INTO events(student_key, ts, page, payload)
+                        SELECT COALESCE(s.id, k.student_key) sk, i.ts, i.page, i.payload FROM temp.import_events i
+                        LEFT JOIN students s ON s.student_id=i.student_id LEFT JOIN temp.import_keys k ON k.student_id=i.student_id
+                        WHERE sk IS NOT NULL ORDER BY i.ts""").rowcount
+    if n and rollup:
+        conn.execute(ROLLUP_ACTIVITY_SQL.format(where="e.id>?"), (last,))
+        conn.execute(ROLLUP_COUNTERS_SQL.format(where="e.id>?"), (last, last))
+    elif n:
+        conn.execute("INSERT OR IGNORE INTO sync_checkpoints(name, pos, updated_at) VALUES ('rollup:stale', 1, ?)", (time.time(),))
+    return n
+
+def import_jsonl(path:str, loader, batch:int=IMPORT_BATCH)->dict:
+    """한 파일을 이어서 가져옴. 파일 앞부분이 바뀌었으면(다시 쓴 파일) 처음부터 — 중복은 유일 인덱스가 거름"""
+    name = f"import:{path}"; stats = collections.Counter()
+    with open(path, "rb") as f:
+        with _db().read() as conn:
+            row = conn.execute("SELECT pos, head FROM sync_checkpoints WHERE name=?", (name,)).fetchone()
+        size = os.fstat(f.fileno()).st_size
+        start = row[0] if row and row[0] <= size and row[1] == _file_head(f, row[0]) else 0
+        for rows, pos, bad in _jsonl_batches(f, start, batch):
+            head = _file_head(f, pos); f.seek(pos)
+            with _db().tx() as conn:
+                added = loader(conn, rows)
+                if added: _bump_all_versions(conn)
+                stats["added"] += added; stats["read"] += len(rows); stats["bad"] += bad
+                conn.execute("INSERT OR REPLACE INTO sync_checkpoints(name, pos, head, updated_at) VALUES (?,?,?,?)",
+                             (name, pos, head, time.time()))
+    return stats
+
+def import_all_jsonl(students_path:str=GH_STUDENTS_PATH, events_path:str=GH_EVENTS_PATH)->dict:
+    """학생 먼저, 그다음 기록. {파일: {"read","added","bad"}}"""
+    with _db().read() as conn:
+        bulk = conn.execute("""SELECT NOT EXISTS(SELECT 1 FROM events)
+                               OR EXISTS(SELECT 1 FROM sync_checkpoints WHERE name='rollup:stale')""").fetchone()[0]
+    out = {}
+    for p in _jsonl_files(students_path): out[p] = import_jsonl(p, _import_students)
+    for p in _jsonl_files(events_path):   out[p] = import_jsonl(p, functools.partial(_import_events, rollup=not bulk))
+    if bulk:
+        with _db().tx() as conn:
+            _rollup_backfill(conn); _bump_all_versions(conn)
+            conn.execute("DELETE FROM sync_checkpoints WHERE name='rollup:stale'")
+    return out
+
+def _export_rows(path:str, sql:str, to_record, batch:int=IMPORT_BATCH)->int:
+    # 지난번 마지막 rowid 다음부터 이어 붙임. 내보낸 파일이 없어졌으면 처음부터
+    name = f"export:{path}"
+    with _db().read() as conn:
+        row = conn.execute("SELECT pos FROM sync_checkpoints WHERE name=?", (name,)).fetchone()
+    last = row[0] if row and os.path.exists(path) else 0; n = 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a" if last else "w", encoding="utf-8") as out, _db().read() as conn:
+        cur = conn.execute(sql, (last,))
+        while chunk := cur.fetchmany(batch):
+            out.writelines(json.dumps(to_record(conn, r), ensure_ascii=False)+"\n" for r in chunk)
+            last = chunk[-1][0]; n += len(chunk)
+    with _db().tx() as conn:
+        conn.execute("INSERT OR REPLACE INTO sync_checkpoints(name, pos, head, updated_at) VALUES (?,?,?,?)", (name, last, None, time.time()))
+    return n
+
+def _payload_obj(raw:str, conn=None):
+    # conn을 주면 blob 참조까지 풀어 원래 payload로
+    try: d = json.loads(raw)
+    except Exception: return {"_raw": raw}
+    return hydrate_payload(conn, d) if conn is not None and isinstance(d, dict) else d
+
+def export_all_jsonl(students_path:str="export/students.jsonl", events_path:str="export/events.jsonl")->dict:
+    """새로 생긴 학생·기록만 data/*.jsonl과 같은 형식으로 덧붙여 씀 (python app.py export-jsonl)"""
+    return {
+        students_path: _export_rows(students_path,
+            """SELECT s.id, s.student_id, s.year, sc.name, s.grade, s.klass, s.number, s.name, s.created_at
+               FROM students s JOIN schools sc ON sc.id=s.school_id WHERE s.id>? ORDER BY s.id""",
+            lambda conn, r: {"type":"student", "student_id":r[1], "year":r[2], "school":r[3], "grade":r[4], "klass":r[5],
+                             "number":r[6], "name":r[7] or "", "ts":r[8]}),
+        events_path: _export_rows(events_path,
+            "SELECT e.id, s.student_id, e.ts, e.page, e.payload FROM events e JOIN students s ON s.id=e.student_key WHERE e.id>? ORDER BY e.id",
+            lambda conn, r: {"type":"event", "student_id":r[1], "ts":r[2], "page":r[3], "payload":_payload_obj(r[4], conn)}),
+    }
+
+@st.cache_resource(show_spinner="지난 기록을 불러오는 중…")
+def startup_import()->dict:
+    # 새로 배포된 컨테이너(빈 DB)에서도 저장소의 JSONL로 한 번 복원. 이미 읽은 부분은 체크포인트로 건너뜀
+    try: return import_all_jsonl()
+    except Exception as e: return {"error": str(e)}
+
+#  대시보드 결과 캐시: (함수, 인자, 필터) → (그 필터 범위의 데이터 버전, 결과). 버전이 그대로면 DB를 다시 읽지 않음.
+#  프로세스 공용 LRU — 돌려받은 결과는 여러 세션이 같이 쓰므로 고치지 말 것
+DASH_CACHE_SIZE = 256
+DASH_FILTERS = ("year", "school", "grade", "klass", "number")
+
+def _filter_scope(flt:dict)->str:
+    # 앞에서부터 연속으로 지정된 값까지가 범위. (학년도, 학년)만 골랐으면 "학년도" 범위의 버전을 봄
+    vals = []
+    for k in DASH_FILTERS:
+        v = flt.get(k)
+        if k == "school": v = (v or "").strip()
+        if not v: break
+        vals.append(v if k == "school" else str(int(v)))
+    return "|".join(vals)
+
+class DashCache:
+    def __init__(self, size:int=DASH_CACHE_SIZE):
+        self.size = size; self.data = collections.OrderedDict(); self.lock = threading.Lock()
+        self.stats = collections.Counter()   # hit, miss, stale
+
+    def get_or_compute(self, key, scope:str, compute):
+        with _db().read() as conn:
+            ver = tuple(conn.execute("""SELECT (SELECT v FROM data_version WHERE scope=?),
+                                               (SELECT v FROM data_version WHERE scope='*')""", (scope,)).fetchone())
+        with self.lock:
+            hit = self.data.get(key)
+            if hit and hit[0] == ver:
+                self.data.move_to_end(key); self.stats["hit"] += 1
+                return hit[1]
+            self.stats["stale" if hit else "miss"] += 1
+        out = compute()
+        with self.lock:
+            self.data[key] = (ver, out); self.data.move_to_end(key)
+            while len(self.data) > self.size: self.data.popitem(last=False)
+        return out
+
+@st.cache_resource
+def dash_cache():
+    return DashCache()
+
+def dash_cached(fn):
+    # 필터는 키워드 인자(year=…, number=…)로, 그 밖의 인자는 위치 인자로 받는 조회 함수에 씀
+    @functools.wraps(fn)
+    def wrapper(*args, **flt):
+        key = (fn.__name__, args, tuple(flt.get(k) for k in DASH_FILTERS))
+        return dash_cache().get_or_compute(key, _filter_scope(flt), lambda: fn(*args, **flt))
+    return wrapper
+
+#  대시보드 집계: 지표는 SQL GROUP BY로 작은 결과만 받고, 긴 payload는 학생 포트폴리오를 열 때만 읽음
+def _dash_scope(year=None, school=None, grade=None, klass=None, number=None):
+    """필터 → (FROM 절, WHERE 절, 파라미터). 개별 학생이 정확히 지정되면 정수 키 하나로 events를 조회."""
+    school = _norm_school(school); src = "events e JOIN students s ON s.id=e.student_key"
+    if year and school and grade and klass and number:
+        hit = student_key(f"{int(year)}-{school}-{int(grade)}-{int(klass)}-{int(number)}")
+        return src, "e.student_key=?", [hit[0] if hit else -1]
+    return (src, *_class_filter("s.", year, school, grade, klass, number))
+
+def _class_filter(prefix:str, year=None, school=None, grade=None, klass=None, number=None):
+    # 학교는 이름 대신 schools.id로 (모르는 학교면 아무것도 안 맞게 -1)
+    where, params = ["1=1"], []
+    if school := _norm_school(school):
+        sc = school_id(school); where.append(f"{prefix}school_id=?"); params.append(-1 if sc is None else sc)
+    for col, val in (("year",year), ("grade",grade), ("klass",klass), ("number",number)):
+        if val: where.append(f"{prefix}{col}=?"); params.append(val)
+    return " AND ".join(where), params
+
+def _rollup_scope(**flt):
+    return _class_filter("", **flt)
+
+@dash_cached
+def db_dashboard_metrics(**flt)->dict:
+    # 집계 테이블만 읽음 → 비용은 이벤트 수가 아니라 (학생×월×활동) 그룹 수에 비례
+    where, params = _rollup_scope(**flt)
+    with _db().read() as conn:
+        page_counts = conn.execute(f"SELECT page, SUM(n) c FROM rollup_activity WHERE {where} GROUP BY page ORDER BY c DESC", params).fetchall()
+        avg_quiz, avg_pro, avg_con = conn.execute(
+            f"""SELECT SUM(CASE WHEN page='quiz' THEN score_sum END)/NULLIF(SUM(CASE WHEN page='quiz' THEN score_n END),0),
+                       SUM(CASE WHEN page='debate' THEN pro_sum END)/NULLIF(SUM(CASE WHEN page='debate' THEN pro_n END),0),
+                       SUM(CASE WHEN page='debate' THEN con_sum END)/NULLIF(SUM(CASE WHEN page='debate' THEN con_n END),0)
+                FROM rollup_activity WHERE {where} AND page IN ('quiz','debate')""", params).fetchone()
+        top_books = conn.execute(
+            f"""SELECT key, SUM(n) c FROM rollup_counters WHERE kind='book' AND {where}
+                GROUP BY key ORDER BY c DESC, MIN(first_ts) LIMIT 5""", params).fetchall()
+        monthly_reads = conn.execute(
+            f"SELECT month, SUM(n) FROM rollup_activity WHERE {where} AND page='book' GROUP BY month ORDER BY month", params).fetchall()
+        score_dist = conn.execute(
+            f"""SELECT CAST(key AS INTEGER) sc, SUM(n) FROM rollup_counters WHERE kind='quiz_score' AND {where}
+                GROUP BY sc ORDER BY sc""", params).fetchall()
+    return {"total": sum(n for _, n in page_counts), "page_counts": page_counts,
+            "avg_quiz": avg_quiz, "avg_pro": avg_pro, "avg_con": avg_con,
+            "top_books": top_books, "monthly_reads": monthly_reads, "score_dist": score_dist}
+
+@dash_cached
+def db_quiz_series(**flt)->list:
+    src, where, params = _dash_scope(**flt)
+    with _db().read() as conn:
+        return conn.execute(f"""SELECT e.ts, s.student_id, e.score FROM {src}
+                                WHERE {where} AND e.page='quiz' AND e.score IS NOT NULL ORDER BY e.ts""", params).fetchall()
+
+@dash_cached
+def db_recent_events(limit:int=50, **flt)->list:
+    src, where, params = _dash_scope(**flt)
+    with _db().read() as conn:
+        rows = conn.execute(f"SELECT e.ts, s.student_id, e.page FROM {src} WHERE {where} ORDER BY e.ts DESC LIMIT ?",
+                            params+[limit]).fetchall()
+    return rows[::-1]
+
+@dash_cached
+def db_event_titles(page:str, **flt)->list:
+    # [(id, ts, title)] — 목록에는 payload 본문을 싣지 않음
+    src, where, params = _dash_scope(**flt)
+    with _db().read() as conn:
+        return conn.execute(f"SELECT e.id, e.ts, e.title FROM {src} WHERE {where} AND e.page=? ORDER BY e.ts",
+                            params+[page]).fetchall()
+
+def db_event_payload(event_id:int)->dict:
+    # 한 건만 열 때 blob(토론 기록·감상문·피드백)까지 풀어 돌려줌
+    with _db().read() as conn:
+        row = conn.execute("SELECT payload FROM events WHERE id=?", (event_id,)).fetchone()
+        return _payload_obj(row[0], conn) if row else {}
+
+#  저장 
+def _norm_school(s:str)->str:
+    return (s or "").strip()
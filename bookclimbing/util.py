@@ -0,0 +1,51 @@
+# 북클라이밍 · 공용 도구
+
+import streamlit as st, re, json, threading, contextlib, concurrent.futures
+
+# 유틸 
+def clean_html(t): return re.sub(r"<.*?>","",t or "")
+def strip_fence(t): return re.sub(r"^```(json)?|```$", "", t.strip(), flags=re.M)
+def _json_ok(raw:str)->bool:
+    try: json.loads(strip_fence(raw)); return True
+    except Exception: return False
+
+#  책 식별: ISBN(없으면 제목|저자)
+def _isbn(b:dict):
+    # 네이버 isbn 필드는 "ISBN10 ISBN13" 형태일 수 있음 → 마지막(13자리) 사용
+    isbn=(b.get("isbn") or "").split()
+    return isbn[-1] if isbn else None
+def book_key(b:dict)->str:
+    return _isbn(b) or f"{clean_html(b.get('title','')).strip()}|{clean_html(b.get('author','')).strip()}"
+
+#  LLM 우선순위: 스레드별 값이라 병렬 실행 풀에도 넘겨 줌 (스케줄러가 이 순서로 토큰을 나눠 줌)
+PRIO_INTERACTIVE, PRIO_BATCH = 0, 1   # 숫자가 작을수록 먼저. 학생 화면의 호출 > 사전 생성 같은 배치 작업
+_llm_local = threading.local()
+
+def llm_priority()->int:
+    return getattr(_llm_local, "prio", PRIO_INTERACTIVE)
+
+@contextlib.contextmanager
+def llm_priority_as(prio:int):
+    prev = llm_priority(); _llm_local.prio = prio
+    try: yield
+    finally: _llm_local.prio = prev
+
+#  병렬 실행: 서로 독립적인 네트워크 호출을 공용 스레드 풀에서 동시에 (벽시계 시간 = 가장 느린 호출)
+IO_WORKERS = 16
+
+@st.cache_resource
+def _io_pool():
+    return concurrent.futures.ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+
+def run_parallel(calls:list, timeout:float=60, default=None)->list:
+    """인자 없는 호출 목록을 동시에 실행해 입력 순서대로 결과를 돌려줌.
+    예외·시간 초과는 default로 바꿔 바로 돌아옴. 풀에서 아직 시작 못 한 작업만 취소되고, 이미 돌고 있던 작업은
+    끝날 때까지 풀 스레드를 잡고 계속 실행됨(결과는 버림) — 그러니 각 호출은 자기 요청 타임아웃을 따로 가져야 함.
+    (작업 안에서 st.* 사용 금지)"""
+    prio = llm_priority()   # 풀 스레드에도 호출한 쪽의 LLM 우선순위를 넘김
+    def _as(c):
+        with llm_priority_as(prio): return c()
+    futs = [_io_pool().submit(_as, c) for c in calls]
+    done, pending = concurrent.futures.wait(futs, timeout=timeout)
+    for f in pending: f.cancel()
+    return [f.result() if f in done and f.exception() is None else default for f in futs]
@@ -0,0 +1,16 @@
+# 테스트 공통: 가짜 secrets로 bookclimbing을 임포트하고, 테스트마다 새 SQLite 파일을 _db()로 씀
+#   python -m pytest -q
+
+import os, pytest
+from streamlit import config as st_config
+
+st_config.set_option("secrets.files", [os.path.join(os.path.dirname(__file__), "secrets.toml")])
+
+from bookclimbing import storage
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    d = storage._Database(str(tmp_path / "classdb.db"))
+    monkeypatch.setattr(storage, "_db", lambda: d)
+    storage.id_cache.clear(); storage.dash_cache.clear()   # 버전 번호는 DB마다 0부터라 앞 테스트의 결과가 남아 있으면 그대로 나옴
+    return d
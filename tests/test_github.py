@@ -0,0 +1,69 @@
+# GitHub 동기화 큐: 묶어서 한 커밋, 실패 시 백오프, 거절된 기록은 반씩 나눠 찾아 따로 둠
+
+import json
+import time
+import pytest
+from bookclimbing.clients import github as G
+
+def make_queue(db, monkeypatch, poison=None, **kw):
+    monkeypatch.setattr(G.GhSyncQueue, "_run", lambda self: None)   # 백그라운드 루프 없이 flush를 직접 부름
+    q = G.GhSyncQueue(db, batch=8, interval=1, **kw)
+    for i in range(20): q.put("data/events.jsonl", {"i": i, "x": "poison" if i == poison else "ok"})
+    return q
+
+@pytest.fixture
+def queue(db, monkeypatch):
+    return make_queue(db, monkeypatch)
+
+@pytest.fixture
+def poisoned(db, monkeypatch):
+    return make_queue(db, monkeypatch, poison=5, max_backoff=10)
+
+def fake_github(monkeypatch, down=False):
+    sent = []
+    def commit(files, message):
+        sent.append(files); body = "".join(files.values())
+        if down: return False, "ref GET failed: 503"
+        if '"poison"' in body: return None, "tree POST failed: 422"
+        return True, "sha"
+    monkeypatch.setattr(G, "gh_commit_files", commit)
+    return sent
+
+def test_flush_commits_one_batch_as_a_new_segment(queue, monkeypatch):
+    sent = fake_github(monkeypatch)
+    assert queue.flush() and queue.depth() == 12
+    (path, body), = sent[0].items()
+    assert path.startswith("data/events/") and path.endswith(".jsonl")
+    assert [json.loads(l)["i"] for l in body.splitlines()] == list(range(8))
+    while queue.depth(): queue.flush()
+    assert (queue.stats["commits"], queue.stats["flushed"]) == (3, 20)
+
+def test_failed_flush_keeps_records(queue, monkeypatch):
+    fake_github(monkeypatch, down=True)
+    assert not queue.flush()
+    assert queue.depth() == 20 and queue.stats["failures"] == 1 and "503" in queue.stats["last_error"]
+
+def test_failures_back_off_exponentially(poisoned, monkeypatch):
+    fake_github(monkeypatch, down=True)
+    delays = []
+    for _ in range(6):
+        assert not poisoned.flush(); delays.append(poisoned.retry_at - time.time())
+    assert 0.7 < delays[0] < 1.3 and 1.5 < delays[1] < 2.5 and 3 < delays[2] < 5
+    assert 7 < delays[-1] <= 10   # max_backoff에서 멈춤
+    assert poisoned.depth() == 20 and poisoned.stats["failures"] == 6
+
+def test_rejected_record_is_parked_and_the_rest_flows(poisoned, monkeypatch):
+    sent = fake_github(monkeypatch)
+    while poisoned.depth(): assert poisoned.flush()
+    m = poisoned.metrics()
+    assert (m["flushed"], m["parked"], m["retry_in_s"]) == (19, 1, 0)
+    lines = [sum(b.count("\n") for b in f.values()) for f in sent]
+    assert max(lines) == 8 and lines.count(1) == 2   # 반씩 나눠 한 줄까지 좁힘
+    with poisoned.db.read() as conn:
+        assert conn.execute("SELECT line, error FROM gh_deadletter").fetchall() == [('{"i": 5, "x": "poison"}', "tree POST failed: 422")]
+
+def test_success_resets_backoff(poisoned, monkeypatch):
+    fake_github(monkeypatch, down=True); poisoned.flush(); poisoned.flush()
+    fake_github(monkeypatch)
+    while poisoned.depth(): poisoned.flush()
+    assert (poisoned.streak, poisoned.retry_at) == (0, 0.0)
@@ -0,0 +1,107 @@
+# LLM 스케줄러: 재시도·백오프, 같은 요청 합치기, 우선순위 · gpt() 응답 캐시
+
+import itertools, threading, time
+from types import SimpleNamespace as N
+import openai, pytest
+from bookclimbing.clients import llm as L
+from bookclimbing.util import PRIO_BATCH, PRIO_INTERACTIVE
+
+@pytest.fixture
+def sched(monkeypatch):
+    monkeypatch.setattr(L.time, "sleep", lambda s: None)
+    return L.LLMScheduler(rpm=6000, burst=20)
+
+def flaky(errors, result="ok"):
+    calls = []
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(errors): raise errors[len(calls)-1]
+        return result
+    return fn, calls
+
+def conn_error(): return openai.APIConnectionError(request=None)
+
+def test_retries_connection_errors(sched):
+    fn, calls = flaky([conn_error(), conn_error()])
+    assert sched.submit(fn) == "ok"
+    assert len(calls) == 3 and sched.stats["retries"] == 2
+
+def test_gives_up_after_llm_retries(sched):
+    fn, calls = flaky([conn_error()] * 10)
+    with pytest.raises(openai.APIConnectionError): sched.submit(fn)
+    assert len(calls) == L.LLM_RETRIES + 1
+
+def test_other_errors_are_not_retried(sched):
+    fn, calls = flaky([ValueError("bad request")])
+    with pytest.raises(ValueError): sched.submit(fn)
+    assert len(calls) == 1
+
+def test_single_flight_runs_once(sched):
+    gate, calls, out = threading.Event(), [], []
+    def fn(): calls.append(1); gate.wait(5); return "같은 답"
+    ts = [threading.Thread(target=lambda: out.append(sched.single_flight("k", fn))) for _ in range(4)]
+    for t in ts: t.start()
+    while sched.stats["coalesced"] < 3: time.sleep(0.01)
+    gate.set()
+    for t in ts: t.join()
+    assert calls == [1] and out == ["같은 답"] * 4
+
+def test_interactive_calls_jump_the_queue():
+    s = L.LLMScheduler(rpm=600, burst=1)   # 토큰 하나를 다 쓰면 0.1초마다 하나
+    s._acquire(PRIO_INTERACTIVE); order = []
+    bg = threading.Thread(target=lambda: (s._acquire(PRIO_BATCH), order.append("bg"))); bg.start()
+    while not s.waiting: time.sleep(0.01)
+    fg = threading.Thread(target=lambda: (s._acquire(PRIO_INTERACTIVE), order.append("fg"))); fg.start()
+    bg.join(5); fg.join(5)
+    assert order == ["fg", "bg"]
+
+#  gpt() 캐시: 같은 요청은 한 번만, valid에 걸린 답은 남기지 않음, nonce면 새로
+
+@pytest.fixture
+def api(db, monkeypatch):
+    sent, n = [], itertools.count(1)
+    def create(**kw):
+        sent.append(kw); return N(choices=[N(message=N(content=f"답{next(n)}"))], usage=None)
+    monkeypatch.setattr(L, "openai_client", lambda: N(chat=N(completions=N(create=create))))
+    monkeypatch.setattr(L, "_db", lambda: db)
+    cache, sched = L.LLMCache(db), L.LLMScheduler()
+    monkeypatch.setattr(L, "llm_cache", lambda: cache); monkeypatch.setattr(L, "llm_scheduler", lambda: sched)
+    return sent
+
+MSG = [{"role":"user", "content":"퀴즈 만들어줘"}]
+
+def test_same_request_is_served_from_cache(api):
+    assert L.gpt(MSG, kind="quiz") == L.gpt(MSG, kind="quiz") == "답1"
+    assert len(api) == 1
+    assert L.gpt(MSG, kind="cover_chat") != L.gpt(MSG, kind="cover_chat")   # TTL 없는 용도는 매번 새로
+
+def test_invalid_answer_is_not_cached(api):
+    assert L.gpt(MSG, kind="quiz", valid=lambda r: False) == "답1"
+    assert L.gpt(MSG, kind="quiz") == "답2" and L.gpt(MSG, kind="quiz") == "답2"
+
+def test_nonce_regenerates_without_reaching_the_api(api):
+    first = L.gpt(MSG, kind="quiz")
+    again = L.gpt(MSG, kind="quiz", nonce="a1")
+    assert again != first and L.gpt(MSG, kind="quiz", nonce="a1") == again
+    assert L.gpt(MSG, kind="quiz") == first   # nonce 없는 키는 그대로 공유
+    assert all("nonce" not in kw for kw in api)
+
+#  gpt_stream: 같은 요청이 스트리밍 중이면 기다렸다가 같은 텍스트를 받음
+
+def test_concurrent_streams_make_one_call(api, monkeypatch):
+    gate = threading.Event()
+    def create(**kw):
+        api.append(kw)
+        def chunks():
+            gate.wait(5)
+            for d in ["같은 ", "답"]: yield N(usage=None, choices=[N(delta=N(content=d))])
+        return chunks()
+    monkeypatch.setattr(L, "openai_client", lambda: N(chat=N(completions=N(create=create))))
+    out = []
+    ts = [threading.Thread(target=lambda: out.append("".join(L.gpt_stream(MSG, kind="quiz")))) for _ in range(4)]
+    for t in ts: t.start()
+    while L.llm_scheduler().stats["coalesced"] < 3: time.sleep(0.01)
+    gate.set()
+    for t in ts: t.join(5)
+    assert len(api) == 1 and out == ["같은 답"] * 4
+    assert "".join(L.gpt_stream(MSG, kind="quiz")) == "같은 답" and len(api) == 1   # 이후는 캐시에서
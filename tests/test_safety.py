@@ -0,0 +1,37 @@
+# 비속어 검사: 정규화, Aho-Corasick, 템플릿 고쳐 쓰기
+
+import pytest
+from bookclimbing.safety import AhoCorasick, contains_bad_language, normalize_for_match, polite_template
+
+def test_normalize_joins_single_letter_pieces():
+    assert normalize_for_match("시 발")[0] == "시발"
+    assert normalize_for_match("시 발표")[0] == "시 발표"
+    assert normalize_for_match("씨.발!!")[0] == "씨발"
+    norm, idx = normalize_for_match("야  ㅄ아")
+    assert norm == "야 ㅂㅅ아" and [idx[i] for i in range(len(norm))] == [0, 3, 3, 3, 4]
+
+def test_aho_corasick_finds_overlapping_words():
+    m = AhoCorasick(["he", "she", "his", "hers"])
+    assert sorted(m.find("ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+    assert m.search("this") and not m.search("hoe")
+
+@pytest.mark.parametrize("text", ["씨 발", "ㅂ ㅅ", "개.새.끼", "ＳＥＸ"])
+def test_contains_bad_language(text):
+    assert contains_bad_language(text)
+
+@pytest.mark.parametrize("text", ["시 발표 준비", "새싹이 자라요", ""])
+def test_clean_text_passes(text):
+    assert not contains_bad_language(text)
+
+@pytest.mark.parametrize("text, fixed", [
+    ("꺼져", "저리 가 줄래"),
+    ("야 새끼야 비켜", "야 친구야 비켜"),
+    ("너 좆같네", "너 속상하네"),
+    ("시 발 짜증나", "짜증나"),
+])
+def test_polite_template_rewrites_whole_words(text, fixed):
+    assert polite_template(text) == fixed
+
+@pytest.mark.parametrize("text", ["새끼손가락을 다쳤어", "불이 죽어가는 것 같아", "시발점이 어디야", "이새끼야", "씹어 먹어"])
+def test_polite_template_leaves_word_fragments_to_the_llm(text):
+    assert polite_template(text) is None
@@ -0,0 +1,153 @@
+# JSONL ↔ SQLite 가져오기·내보내기, 정수 키(v12) 마이그레이션
+
+import json, sqlite3
+import pytest
+from bookclimbing import storage as S
+
+def write_jsonl(path, rows, tail=""):
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r, ensure_ascii=False)+"\n" for r in rows); f.write(tail)
+
+def event(sid, ts, page="book", **payload):
+    return {"type":"event", "student_id":sid, "ts":ts, "page":page, "payload":payload or {"title":"t"}}
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f: return [json.loads(l) for l in f]
+
+def count(db, sql="SELECT COUNT(*) FROM events"):
+    with db.read() as conn: return conn.execute(sql).fetchone()[0]
+
+def test_export_import_round_trip(db, tmp_path, monkeypatch):
+    S.db_insert_student("2025-한국초-3-1-5", 2025, "한국초", 3, 1, 5, "철수")
+    S.db_save_event("2025-한국초-3-1-5", "quiz", {"title":"책", "score":80}, "2025-03-02T09:00:00")
+    S.db_save_event("2025-한국초-3-1-5", "essay", {"title":"책", "essay":"길게 쓴 글 "*400}, "2025-03-03T09:00:00")   # blob으로 빠지는 크기
+    S.db_save_event("2025-새초-4-2-1", "book", {"title":"다른 책"}, "2025-03-04T09:00:00", student=(2025, "새초", 4, 2, 1, ""))
+    out = S.export_all_jsonl(str(tmp_path/"a/students.jsonl"), str(tmp_path/"a/events.jsonl"))
+    assert list(out.values()) == [2, 3]
+
+    fresh = S._Database(str(tmp_path/"fresh.db")); monkeypatch.setattr(S, "_db", lambda: fresh)
+    S.id_cache.clear()
+    S.import_all_jsonl(str(tmp_path/"a/students.jsonl"), str(tmp_path/"a/events.jsonl"))
+    S.export_all_jsonl(str(tmp_path/"b/students.jsonl"), str(tmp_path/"b/events.jsonl"))
+    for name in ("students.jsonl", "events.jsonl"):
+        assert read_jsonl(tmp_path/"b"/name) == read_jsonl(tmp_path/"a"/name)
+    assert S.db_dashboard_metrics(year=2025, school="한국초")["avg_quiz"] == 80
+
+def test_export_appends_only_new_rows(db, tmp_path):
+    sp, ep = str(tmp_path/"students.jsonl"), str(tmp_path/"events.jsonl")
+    S.db_save_event("2025-한국초-3-1-5", "book", {"title":"a"}, "1")
+    assert S.export_all_jsonl(sp, ep)[ep] == 1
+    S.db_save_event("2025-한국초-3-1-5", "book", {"title":"b"}, "2")
+    assert S.export_all_jsonl(sp, ep)[ep] == 1
+    assert [r["payload"]["title"] for r in read_jsonl(ep)] == ["a", "b"]
+
+def test_import_resumes_after_failed_batch(db, tmp_path):
+    path = str(tmp_path/"events.jsonl")
+    write_jsonl(path, [event("2025-한국초-3-1-5", str(i)) for i in range(10)])
+    calls = []
+    def flaky(conn, rows):
+        calls.append(len(rows))
+        if len(calls) == 3: raise RuntimeError("끊김")
+        return S._import_events(conn, rows)
+    with pytest.raises(RuntimeError): S.import_jsonl(path, flaky, batch=3)
+    assert count(db) == 6   # 앞의 두 묶음은 체크포인트와 함께 커밋됨
+
+    stats = S.import_jsonl(path, S._import_events, batch=3)
+    assert (stats["read"], stats["added"]) == (4, 4)
+    assert count(db) == 10
+    assert S.import_jsonl(path, S._import_events)["read"] == 0
+
+def test_import_waits_for_unfinished_last_line(db, tmp_path):
+    path = str(tmp_path/"events.jsonl")
+    write_jsonl(path, [event("2025-한국초-3-1-5", "1")], tail='{"type":"event","student_id":"2025-한')
+    stats = S.import_jsonl(path, S._import_events)
+    assert (stats["read"], stats["bad"]) == (1, 0)
+    with open(path, "a", encoding="utf-8") as f: f.write('국초-3-1-5","ts":"2","page":"book","payload":{}}\n')
+    assert S.import_jsonl(path, S._import_events)["added"] == 1
+
+def test_import_restarts_when_file_rewritten(db, tmp_path):
+    path = str(tmp_path/"events.jsonl")
+    write_jsonl(path, [event("2025-한국초-3-1-5", str(i)) for i in range(3)])
+    S.import_jsonl(path, S._import_events)
+    write_jsonl(path, [event("2025-한국초-3-1-5", str(i)) for i in (9, 0, 1, 2)])   # 앞부분이 바뀜 → 처음부터, 중복은 유일 인덱스가 거름
+    stats = S.import_jsonl(path, S._import_events)
+    assert (stats["read"], stats["added"]) == (4, 1)
+
+def test_bulk_import_rebuilds_rollups_once(db, tmp_path):
+    sp, ep = str(tmp_path/"students.jsonl"), str(tmp_path/"events.jsonl")
+    write_jsonl(sp, [])
+    write_jsonl(ep, [event("2025-한국초-3-1-5", str(i), "quiz", title="책", score=10*i) for i in range(1, 4)])
+    S.import_all_jsonl(sp, ep)
+    assert count(db, "SELECT SUM(n) FROM rollup_activity") == 3
+    assert S.db_dashboard_metrics(year=2025)["avg_quiz"] == 20
+
+#  정수 키: student_id 나누기, v11 → v12 마이그레이션, 학생 가져오기 충돌
+
+def test_sid_parts():
+    assert S._sid_parts("2025-한국초-3-1-5") == (2025, "한국초", 3, 1, 5)
+    assert S._sid_parts("2025-서울-한국초-3-1-5") == (2025, "서울-한국초", 3, 1, 5)
+    assert S._sid_parts("2025- 한국초 -3-1-5") == (2025, "한국초", 3, 1, 5)
+    with pytest.raises(ValueError): S._sid_parts("garbage")
+    assert S._sid_meta("x-y") == (None, "", None, None, None)
+
+def v11_db(path, students, events):
+    # 옛 문자열 키 스키마(v11)까지 올린 DB
+    c = sqlite3.connect(path, isolation_level=None)
+    for stmts in S.SCHEMA_MIGRATIONS[:11]:
+        for sql in stmts:
+            if not sql.startswith("@"): c.execute(sql)
+    c.execute("PRAGMA user_version=11")
+    c.executemany("INSERT INTO students(student_id, year, school, grade, klass, number, name, created_at) VALUES (?,?,?,?,?,?,?,?)", students)
+    c.executemany("INSERT INTO events(student_id, ts, page, payload) VALUES (?,?,?,?)",
+                  [(sid, ts, "quiz", json.dumps({"title":"책", "score":50})) for sid, ts in events])
+    c.close()
+
+def test_v12_migration_keeps_every_event(tmp_path, monkeypatch):
+    path = str(tmp_path/"v11.db")
+    v11_db(path, [("2025-한국초-3-1-5", 2025, "한국초", 3, 1, 5, "철수", "2025-03-01T09:00:00")],
+           [("2025-한국초-3-1-5", "1"), ("2025-한국초 -3-1-5", "2"),   # 같은 학생의 다른 표기
+            ("2025-새초-4-2-1", "3"),                                  # 학생 행 없이 기록만
+            ("garbage", "4"), ("x-y", "5")])                           # 나눌 수 없는 student_id
+    db = S._Database(path); monkeypatch.setattr(S, "_db", lambda: db); S.id_cache.clear()
+    with db.read() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(S.SCHEMA_MIGRATIONS)
+        got = conn.execute("""SELECT e.ts, s.student_id, sc.name FROM events e JOIN students s ON s.id=e.student_key
+                              JOIN schools sc ON sc.id=s.school_id ORDER BY e.ts""").fetchall()
+    assert got == [("1", "2025-한국초-3-1-5", "한국초"), ("2", "2025-한국초-3-1-5", "한국초"), ("3", "2025-새초-4-2-1", "새초"),
+                   ("4", "garbage", ""), ("5", "x-y", "")]
+    assert S.db_dashboard_metrics()["total"] == 5
+    S.db_save_event("garbage", "book", {"title":"또"}, "6")   # 자리표시 학생에도 계속 저장됨
+    assert count(db) == 6
+
+def test_student_id_variants_share_one_student(db):
+    S.db_save_event("2025-한국초-3-1-5", "book", {}, "1", student=(2025, "한국초", 3, 1, 5, ""))
+    S.db_save_event("2025-한국초 -3-1-5", "book", {}, "2")
+    assert count(db, "SELECT COUNT(*) FROM schools") == 1
+    assert count(db, "SELECT COUNT(DISTINCT student_key) FROM events") == 1
+
+def test_import_students_with_conflicting_keys(db, tmp_path):
+    S.db_insert_student("2025-한국초-3-1-5", 2025, "한국초", 3, 1, 5, "철수")
+    sp, ep = str(tmp_path/"students.jsonl"), str(tmp_path/"events.jsonl")
+    student = lambda sid, klass, number, name, ts: {"type":"student", "student_id":sid, "year":2025, "school":"한국초",
+                                                    "grade":3, "klass":klass, "number":number, "name":name, "ts":ts}
+    write_jsonl(sp, [student("2025-한국초-3-1-5", 2, 9, "영희", "2020"),   # 같은 student_id, 다른 학급 정보
+                     student("2025-한국초 -3-1-5", 1, 5, "", "2019"),      # 같은 학급 정보의 다른 표기
+                     student("2025-한국초-3-2-1", 2, 1, "", "2021")])
+    write_jsonl(ep, [event("2025-한국초 -3-1-5", "1")])
+    S.import_all_jsonl(sp, ep)
+    with db.read() as conn:
+        rows = conn.execute("SELECT student_id, klass, number, name, created_at FROM students ORDER BY id").fetchall()
+    assert rows == [("2025-한국초-3-1-5", 1, 5, "영희", "2019"), ("2025-한국초-3-2-1", 2, 1, "", "2021")]
+    assert count(db, "SELECT COUNT(*) FROM events WHERE student_key=1") == 1
+
+def test_reimporting_students_changes_nothing(db, tmp_path):
+    path = str(tmp_path/"students.jsonl")
+    rows = [{"type":"student", "student_id":f"2025-한국초-3-1-{n}", "year":2025, "school":"한국초",
+             "grade":3, "klass":1, "number":n, "name":"", "ts":"2025"} for n in (1, 2)]
+    version = lambda: count(db, "SELECT COALESCE(SUM(v),0) FROM data_version")
+    write_jsonl(path, rows)
+    assert S.import_jsonl(path, S._import_students)["added"] == 2 and version() == 1
+    write_jsonl(path, rows[::-1])   # 앞부분이 바뀜 → 처음부터 다시 읽지만 바뀌는 학생은 없음
+    assert dict(S.import_jsonl(path, S._import_students)) == {"read":2, "added":0, "bad":0} and version() == 1
+    rows[0]["name"] = "철수"; write_jsonl(path, rows)
+    assert S.import_jsonl(path, S._import_students)["added"] == 1 and version() == 2